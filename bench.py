@@ -0,0 +1,326 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import db
+import loader
+from frame_sql import run_frame_sql
+from nl2sql import NL2SQL
+from result_view import CursorSource, FrameSource
+
+REPORT_PATH = "bench_report.json"
+BASELINE_PATH = "bench_baseline.json"
+DEFAULT_SCALES = (1000, 100000)
+REPEAT = 5
+TOLERANCE = 0.2
+# Differences below this are timer noise, whatever the ratio
+NOISE_MS = 0.25
+VISIBLE_ROWS = 40
+
+# ----------------- Synthetic Tables -------------------
+NAMES = ["Alice", "Bob", "Charlie", "Daisy", "Ethan", "Farah", "Gopal", "Hana", "Ivan", "Jaya"]
+TEAMS = ["Mumbai Indians", "Chennai Super Kings", "Kolkata Knight Riders", "Royal Challengers",
+         "Delhi Capitals", "Rajasthan Royals", "Sunrisers", "Punjab Kings"]
+CITIES = ["Mumbai", "Chennai", "Kolkata", "Bangalore", "Delhi", "Jaipur", "Hyderabad", "Mohali"]
+VENUES = ["Wankhede Stadium", "Chepauk", "Eden Gardens", "Chinnaswamy Stadium", "Feroz Shah Kotla",
+          "Sawai Mansingh Stadium", "Rajiv Gandhi Stadium", "PCA Stadium"]
+UMPIRES = ["Dharmasena", "Gould", "Erasmus", "Menon", "Llong", "Oxenford", "Shamshuddin"]
+
+MATCH_COLUMNS = ["id", "season", "city", "date", "team1", "team2", "toss_winner", "toss_decision",
+                 "result", "dl_applied", "winner", "win_by_runs", "win_by_wickets",
+                 "player_of_match", "venue", "umpire1", "umpire2", "umpire3"]
+
+
+def _grade(marks):
+    for floor, grade in ((90, "A+"), (80, "A"), (70, "B"), (60, "C"), (50, "D")):
+        if marks >= floor:
+            return grade
+    return "F"
+
+
+def students_rows(n, seed=0):
+    rng = random.Random(seed)
+    yield ["id", "name", "marks", "grade"]
+    for i in range(1, n + 1):
+        marks = rng.randint(20, 100)
+        yield [i, f"{rng.choice(NAMES)}{i}", marks, _grade(marks)]
+
+
+def matches_rows(n, seed=0):
+    rng = random.Random(seed)
+    yield MATCH_COLUMNS
+    for i in range(1, n + 1):
+        team1, team2 = rng.sample(TEAMS, 2)
+        winner = rng.choice((team1, team2))
+        by_runs = rng.random() < 0.5
+        city = rng.randrange(len(CITIES))
+        season = rng.randint(2008, 2019)
+        yield [i, season, CITIES[city], f"{season}-{rng.randint(4, 5):02d}-{rng.randint(1, 28):02d}",
+               team1, team2, rng.choice((team1, team2)), rng.choice(("bat", "field")), "normal",
+               int(rng.random() < 0.03), winner, rng.randint(1, 140) if by_runs else 0,
+               0 if by_runs else rng.randint(1, 10), f"{rng.choice(NAMES)} {rng.randint(1, 200)}",
+               VENUES[city], *rng.sample(UMPIRES, 3)]
+
+
+QUERIES = {
+    "students": [
+        "show all students",
+        "students with marks above 80",
+        "students with marks greater than 95",
+        "students with marks below 40",
+        "marks between 60 and 75",
+        "count students with grade A",
+        "how many students",
+        "highest marks",
+        "lowest marks",
+        "total marks",
+        "top 10 students by marks",
+        "name contains Alice",
+        "students where grade is 'A+'",
+        "grade equals B",
+    ],
+    "matches": [
+        "show all matches",
+        "matches in season above 2015",
+        "win by runs greater than 100",
+        "win by wickets below 3",
+        "season between 2010 and 2012",
+        "count matches where city is Mumbai",
+        "how many matches were won by winner 'Chennai Super Kings'",
+        "maximum win_by_runs",
+        "minimum season",
+        "top 5 matches by win_by_runs",
+        "venue like Eden",
+        "location contains Delhi",
+        "toss winner is 'Mumbai Indians'",
+        "home team equals 'Sunrisers'",
+        "umpire is Gould",
+        "year is 2017",
+    ],
+}
+
+TABLES = {"students": students_rows, "matches": matches_rows}
+
+
+# ----------------- Measurement -------------------
+def _timed(fn, repeat=REPEAT):
+    # Median wall time in ms and the last return value
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _sqlite_rows(sql, db_path):
+    stream, _ = db.run_sql(sql, db_path)
+    if isinstance(stream, str):
+        raise RuntimeError(stream)
+    with stream:
+        return sum(len(chunk) for chunk in iter(stream.fetchmany, []))
+
+
+def bench_translation(table, columns, queries, repeat=REPEAT):
+    build_ms, translator = _timed(lambda: NL2SQL(table, columns), repeat)
+    rounds = max(1, 2000 // len(queries))
+
+    def cold():
+        t = NL2SQL(table, columns, cache_size=0)
+        for _ in range(rounds):
+            t.generate_sql_many(queries)
+
+    def warm():
+        for _ in range(rounds):
+            translator.generate_sql_many(queries)
+
+    translator.generate_sql_many(queries)
+    cold_ms, _ = _timed(cold, repeat)
+    warm_ms, _ = _timed(warm, repeat)
+    count = rounds * len(queries)
+    return {
+        "index_build_ms": build_ms,
+        "translate_cold_qps": count / (cold_ms / 1000),
+        "translate_warm_qps": count / (warm_ms / 1000),
+    }, translator.generate_sql_many(queries)
+
+
+def bench_execution(table, sqls, db_path, frame, repeat=REPEAT):
+    sqlite_ms, frame_ms, mismatches, errors = [], [], [], 0
+    for sql in sqls:
+        try:
+            ms, sqlite_count = _timed(lambda: _sqlite_rows(sql, db_path), repeat)
+            sqlite_ms.append(ms)
+            ms, result = _timed(lambda: run_frame_sql(frame, sql, table), repeat)
+            frame_ms.append(ms)
+        except Exception:
+            errors += 1
+            continue
+        if len(result) != sqlite_count:
+            mismatches.append(sql)
+    metrics = {"query_errors": errors, "result_mismatches": len(mismatches)}
+    for name, values in (("sqlite", sqlite_ms), ("frame", frame_ms)):
+        if values:
+            metrics[f"{name}_median_ms"] = statistics.median(values)
+            metrics[f"{name}_p95_ms"] = _percentile(values, 95)
+            metrics[f"{name}_total_ms"] = sum(values)
+    return metrics, mismatches
+
+
+def _tk_tree():
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk()
+    except Exception:
+        return None, None
+    root.withdraw()
+    tree = ttk.Treeview(root, height=VISIBLE_ROWS)
+    return root, (tree, ttk.Scrollbar(root, orient="vertical"))
+
+
+def bench_rendering(table, db_path, frame, repeat=REPEAT):
+    sql = f"SELECT * FROM {table}"
+    middle = len(frame) // 2
+
+    def frame_page():
+        source = FrameSource(frame)
+        source.rows(0, VISIBLE_ROWS)
+        return source.rows(middle, middle + VISIBLE_ROWS)
+
+    def cursor_page():
+        with db.pool.connection(db_path) as conn:
+            return CursorSource(conn.execute(sql)).rows(0, VISIBLE_ROWS)
+
+    metrics = {
+        "frame_page_ms": _timed(frame_page, repeat)[0],
+        "cursor_first_page_ms": _timed(cursor_page, repeat)[0],
+    }
+    root, widgets = _tk_tree()
+    if root is not None:
+        from result_view import VirtualResultView
+        view = VirtualResultView(*widgets)
+        try:
+            metrics["tk_set_source_ms"] = _timed(lambda: view.set_source(FrameSource(frame)), repeat)[0]
+            metrics["tk_scroll_ms"] = _timed(lambda: view.moveto_row(middle), repeat)[0]
+        finally:
+            root.destroy()
+    return metrics
+
+
+def run(scales=DEFAULT_SCALES, repeat=REPEAT, work_dir=None, log=print):
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": db.sqlite3.sqlite_version,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "metrics": {},
+        "mismatches": {},
+    }
+    work_dir = work_dir or tempfile.mkdtemp(prefix="askdb-bench-")
+    for table, make_rows in TABLES.items():
+        queries = QUERIES[table]
+        for scale in scales:
+            name = f"{table}/{scale}"
+            log(f"{name}: generating")
+            db_path = os.path.join(work_dir, f"{table}_{scale}.db")
+            if os.path.exists(db_path):
+                os.remove(db_path)
+            load_ms, _ = _timed(lambda: loader.load_rows_to_sqlite(make_rows(scale), table, db_path), 1)
+            rows = make_rows(scale)
+            header = next(rows)
+            frame = pd.DataFrame(list(rows), columns=header)
+
+            metrics = {"load_sqlite_ms": load_ms}
+            log(f"{name}: translating")
+            translated, sqls = bench_translation(table, list(header), queries, repeat)
+            metrics.update(translated)
+            log(f"{name}: executing {len(sqls)} queries")
+            executed, mismatches = bench_execution(table, sqls, db_path, frame, repeat)
+            metrics.update(executed)
+            log(f"{name}: rendering")
+            metrics.update(bench_rendering(table, db_path, frame, repeat))
+            db.pool.close_all(db_path)
+
+            report["metrics"][name] = {k: round(v, 3) for k, v in metrics.items()}
+            if mismatches:
+                report["mismatches"][name] = mismatches
+    return report
+
+
+# ----------------- Baseline Comparison -------------------
+def _higher_is_better(metric):
+    return metric.endswith("_qps")
+
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    regressions = []
+    for name, metrics in report["metrics"].items():
+        base = baseline.get("metrics", {}).get(name, {})
+        for metric, value in metrics.items():
+            old = base.get(metric)
+            if old is None:
+                continue
+            if metric.endswith("_ms"):
+                worse = value - old > max(old * tolerance, NOISE_MS)
+            elif _higher_is_better(metric):
+                worse = value < old * (1 - tolerance)
+            else:
+                # Counters such as errors and mismatches must not grow
+                worse = value > old
+            if worse:
+                regressions.append({"case": name, "metric": metric, "baseline": old, "current": value,
+                                    "change": round((value - old) / old, 3) if old else None})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AskDB translation/execution/rendering benchmark")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--output", default=REPORT_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write this run as the new baseline instead of comparing")
+    args = parser.parse_args(argv)
+
+    report = run(args.scales, args.repeat, log=lambda msg: print(msg, file=sys.stderr))
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+    report["regressions"] = regressions
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, metrics in report["metrics"].items():
+        print(f"{name}: " + ", ".join(f"{k}={v:g}" for k, v in metrics.items()))
+    for r in regressions:
+        print(f"REGRESSION {r['case']} {r['metric']}: {r['baseline']:g} -> {r['current']:g}")
+    print(f"Report written to {args.output}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+from db import pool, quote_ident, watch_cancel
+
+TOP_N = 20
+MAX_POINTS = 1000
+AGGREGATES = ("SUM", "AVG", "COUNT", "MAX", "MIN")
+OTHER = "Other"
+FETCH_SIZE = 50000
+
+
+# ----------------- Downsampling -------------------
+def lttb_indices(x, y, threshold=MAX_POINTS):
+    # Largest-Triangle-Three-Buckets: picks `threshold` points that keep the
+    # visual shape of a long series. x must be sorted and numeric.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        nxt_end = edges[i + 2] if i + 2 < len(edges) else n
+        nxt = slice(end, max(nxt_end, end + 1))
+        avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def _line(xs, ys, max_points):
+    numeric_x = xs.astype("datetime64[ns]").astype(np.int64) if xs.dtype.kind == "M" else xs.astype(float)
+    idx = lttb_indices(numeric_x, ys, max_points)
+    return {"kind": "line", "x": list(xs[idx]), "y": list(ys[idx])}
+
+
+def _bars(labels, values, total, top_n):
+    # labels/values are sorted descending; the tail is folded into "Other"
+    labels, values = list(labels), [np.nan if v is None else float(v) for v in values]
+    if len(labels) > top_n:
+        labels, values = labels[:top_n], values[:top_n]
+        if total is not None:
+            labels.append(OTHER)
+            values.append(total - float(np.nansum(values)))
+    return {"kind": "bar", "x": [str(v) for v in labels], "y": values}
+
+
+# ----------------- DataFrame Results -------------------
+def frame_chart_data(frame, x_col, y_col, agg="SUM", top_n=TOP_N, max_points=MAX_POINTS):
+    # Works on a copy of the y column; the source frame is left untouched
+    x = frame[x_col]
+    y = pd.to_numeric(frame[y_col], errors="coerce")
+    if agg != "COUNT" and y.dropna().empty:
+        raise ValueError(f"No numeric data found in column '{y_col}'.")
+    series_axis = pd.api.types.is_numeric_dtype(x) or pd.api.types.is_datetime64_any_dtype(x)
+    if series_axis and x.nunique() > top_n:
+        points = pd.DataFrame({"x": x, "y": y}).dropna().sort_values("x", kind="stable")
+        return _line(points["x"].to_numpy(), points["y"].to_numpy(dtype=float), max_points)
+    grouped = y.groupby(x, observed=True, sort=False)
+    func = {"SUM": "sum", "AVG": "mean", "COUNT": "size", "MAX": "max", "MIN": "min"}[agg]
+    values = getattr(grouped, func)().sort_values(ascending=False)
+    # Only additive aggregates get an "Other" bucket
+    total = float(values.sum()) if agg in ("SUM", "COUNT") else None
+    return _bars(values.index[:top_n + 1], values.to_numpy(dtype=float)[:top_n + 1], total, top_n)
+
+
+# ----------------- SQLite Results -------------------
+# The grouping runs inside SQLite over the current query, so only the top-N
+# groups (or the points of a numeric series) ever reach Python.
+def sql_chart_data(sql, db_path, x_col, y_col, agg="SUM", top_n=TOP_N, max_points=MAX_POINTS,
+                   cancel=None):
+    inner = sql.strip().rstrip(";")
+    x, y = quote_ident(x_col), quote_ident(y_col)
+    value = "COUNT(*)" if agg == "COUNT" else f"{agg}(CAST({y} AS REAL))"
+    with pool.connection(db_path) as conn:
+        watch_cancel(conn, cancel)
+        distinct, numeric = conn.execute(
+            f"SELECT COUNT(DISTINCT {x}), COUNT({x}) = SUM(typeof({x}) IN ('integer', 'real')) "
+            f"FROM ({inner})").fetchone()
+        if numeric and distinct > top_n:
+            cursor = conn.execute(
+                f"SELECT {x}, CAST({y} AS REAL) FROM ({inner}) "
+                f"WHERE {x} IS NOT NULL AND {y} IS NOT NULL ORDER BY {x}")
+            chunks = []
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                chunks.append(np.asarray(rows, dtype=float))
+            if not chunks:
+                raise ValueError(f"No numeric data found in column '{y_col}'.")
+            points = np.concatenate(chunks)
+            return _line(points[:, 0], points[:, 1], max_points)
+
+        rows = conn.execute(
+            f"SELECT {x}, {value} AS v FROM ({inner}) GROUP BY {x} "
+            f"ORDER BY v DESC LIMIT {top_n + 1}").fetchall()
+        if agg != "COUNT" and all(v is None for _, v in rows):
+            raise ValueError(f"No numeric data found in column '{y_col}'.")
+        total = None
+        if len(rows) > top_n and agg in ("SUM", "COUNT"):
+            total = conn.execute(f"SELECT {value} FROM ({inner})").fetchone()[0] or 0.0
+    return _bars([r[0] for r in rows], [r[1] for r in rows], total, top_n)
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+# Text columns with fewer distinct values than this share of the rows become categoricals
+CATEGORY_RATIO = 0.5
+_INT_TYPES = [np.int8, np.int16, np.int32, np.int64]
+_UINT_TYPES = [np.uint8, np.uint16, np.uint32, np.uint64]
+
+
+# ----------------- Column Rules -------------------
+def _smallest_int(lo, hi):
+    for dtype in (_UINT_TYPES if lo >= 0 else _INT_TYPES):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    return None
+
+
+def _nullable(dtype):
+    # numpy int8 -> pandas Int8, uint16 -> UInt16
+    name = np.dtype(dtype).name
+    return "UInt" + name[4:] if name.startswith("uint") else "Int" + name[3:]
+
+
+def _compact_ints(series):
+    values = series.dropna()
+    if values.empty:
+        return series
+    dtype = _smallest_int(int(values.min()), int(values.max()))
+    if dtype is None or np.dtype(dtype).itemsize >= series.dtype.itemsize:
+        return series
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        return series.astype(_nullable(dtype))
+    return series.astype(dtype)
+
+
+def _compact_floats(series):
+    values = series.dropna()
+    if values.empty:
+        return series
+    if np.isfinite(values).all() and (values == np.floor(values)).all():
+        # Whole numbers stored as float only because of NULLs
+        dtype = _smallest_int(int(values.min()), int(values.max()))
+        if dtype is not None:
+            # Nullable ints keep NULLs as <NA>
+            return series.astype(_nullable(dtype))
+    if series.dtype == np.float64:
+        narrow = series.astype(np.float32)
+        # Only when every value survives the round trip unchanged
+        if (narrow.astype(np.float64).eq(series) | series.isna()).all():
+            return narrow
+    return series
+
+
+def _compact_text(series, ratio):
+    values = series.dropna()
+    if values.empty or not all(isinstance(v, str) for v in values.head(1000)):
+        return series
+    if values.nunique() < ratio * len(series):
+        return series.astype("category")
+    return series
+
+
+def compact_column(series, ratio=CATEGORY_RATIO):
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype):
+        return series
+    if pd.api.types.is_integer_dtype(dtype):
+        return _compact_ints(series)
+    if pd.api.types.is_float_dtype(dtype):
+        return _compact_floats(series)
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        return _compact_text(series, ratio)
+    return series
+
+
+# ----------------- Frames -------------------
+def compact_frame(frame, ratio=CATEGORY_RATIO):
+    # Returns a new frame; columns that do not shrink are shared, not copied.
+    # Missing values stay missing (NaN / <NA>), nothing is filled in.
+    columns = {}
+    for name in frame.columns:
+        columns[name] = compact_column(frame[name], ratio)
+    return pd.DataFrame(columns, columns=frame.columns, copy=False)
+
+
+def memory_report(before, after=None):
+    # One row per column with dtype and deep memory before/after compaction
+    after = compact_frame(before) if after is None else after
+    old = before.memory_usage(index=False, deep=True)
+    new = after.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        "dtype_before": before.dtypes.astype(str),
+        "dtype_after": after.dtypes.astype(str),
+        "bytes_before": old,
+        "bytes_after": new,
+    })
+    report["saved"] = 1 - report["bytes_after"] / report["bytes_before"].where(report["bytes_before"] > 0)
+    return report
+
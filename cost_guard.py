@@ -0,0 +1,140 @@
+import re
+import time
+
+from db import pool, quote_ident
+
+# Tables at least this big are "large"; full scans of them get guarded
+LARGE_TABLE_ROWS = 100000
+PREVIEW_ROWS = 1000
+TIME_BUDGET_S = 30.0
+ROW_BUDGET = 1000000
+# off: run as written, warn: report full scans, limit: also cap previews with a LIMIT
+GUARD_MODES = ("off", "warn", "limit")
+
+_QUOTED_RE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\S+)(?: AS (\S+))?", re.I)
+_NOT_ALIAS = r"(?:where|join|inner|left|cross|natural|on|using|group|order|limit|union|except|intersect)\b"
+_FROM_RE = re.compile(rf"""\b(?:from|join)\s+("(?:[^"]|"")+"|[\w.]+)(?:\s+(?:as\s+)?(?!{_NOT_ALIAS})(\w+))?""", re.I)
+# A lone aggregate returns one row whatever the LIMIT
+_AGGREGATE_RE = re.compile(r"^select\s+(?:count|sum|avg|min|max|total|group_concat)\s*\(", re.I)
+
+
+# ----------------- Budget -------------------
+# Stands in for a cancel Event on a connection (db.watch_cancel): SQLite's
+# progress handler polls is_set() every PROGRESS_STEPS VM steps, so a query
+# that runs past its time budget, or whose reader has pulled more rows than
+# the row budget, is interrupted. exceeded says which limit was hit.
+class Budget:
+    def __init__(self, seconds=TIME_BUDGET_S, rows=ROW_BUDGET, cancel=None):
+        self.seconds = seconds
+        self.rows = rows
+        self.cancel = cancel
+        self.rows_read = 0
+        self.exceeded = None
+        self.deadline = None
+        self.start()
+
+    def start(self):
+        self.deadline = time.monotonic() + self.seconds if self.seconds else None
+
+    def stop(self):
+        # Later fetches (e.g. scrolling a streamed grid) only honour cancel
+        self.deadline = None
+
+    def add_rows(self, n):
+        self.rows_read += n
+
+    def is_set(self):
+        if self.cancel is not None and self.cancel.is_set():
+            return True
+        if self.exceeded is None:
+            if self.deadline is not None and time.monotonic() > self.deadline:
+                self.exceeded = "time"
+            elif self.rows and self.rows_read > self.rows:
+                self.exceeded = "rows"
+        return self.exceeded is not None
+
+    def message(self):
+        if self.exceeded == "time":
+            return (f"Stopped after the {self.seconds:g} s time budget. "
+                    "Add a filter or a LIMIT, or raise the budget.")
+        if self.exceeded == "rows":
+            return (f"Stopped after the {self.rows:,}-row budget. "
+                    "Add a filter or a LIMIT, or raise the budget.")
+        return None
+
+
+# ----------------- Plan Check -------------------
+def _strip_literals(sql):
+    return _QUOTED_RE.sub(lambda m: "''" if m.group(0)[0] == "'" else m.group(0), sql)
+
+
+def _unquote(name):
+    return name[1:-1].replace('""', '"') if name.startswith('"') else name
+
+
+def _aliases(sql):
+    # alias/table name -> table name, for matching "SCAN m" back to its table
+    names = {}
+    for table, alias in _FROM_RE.findall(_strip_literals(sql)):
+        table = _unquote(table).split(".")[-1]
+        names[table.lower()] = table
+        if alias:
+            names[alias.lower()] = table
+    return names
+
+
+def table_rows(conn, table):
+    # Row estimate without counting: ANALYZE stats if present, else max(rowid)
+    try:
+        row = conn.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ? AND idx IS NULL", (table,)).fetchone()
+        if row:
+            return int(row[0].split()[0])
+    except Exception:
+        pass
+    try:
+        return conn.execute(f"SELECT MAX(rowid) FROM {quote_ident(table)}").fetchone()[0] or 0
+    except Exception:
+        # WITHOUT ROWID tables, views
+        return None
+
+
+def full_scans(conn, sql):
+    # [(table, estimated rows)] for every table EXPLAIN QUERY PLAN reads in full
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    names = _aliases(sql)
+    tables = {row[0].lower(): row[0] for row in
+              conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    scans = []
+    for detail in plan:
+        m = _SCAN_RE.match(detail)
+        if not m or "INDEX" in detail:
+            continue
+        name = (m.group(1) or "").lower()
+        table = tables.get(names.get(name, name).lower())
+        if table and table not in [t for t, _ in scans]:
+            scans.append((table, table_rows(conn, table)))
+    return scans
+
+
+def guard(sql, db_path, mode="limit", large_rows=LARGE_TABLE_ROWS, preview_rows=PREVIEW_ROWS):
+    # Returns (sql to run, warning or None). Statements that already have a
+    # LIMIT or cannot be planned are passed through; running them reports
+    # the real error.
+    bare = _strip_literals(sql.strip())
+    if mode == "off" or not bare.lower().startswith(("select", "with")) or re.search(r"\blimit\b", bare, re.I):
+        return sql, None
+    try:
+        with pool.connection(db_path) as conn:
+            scans = full_scans(conn, sql.strip().rstrip(";"))
+    except Exception:
+        return sql, None
+    large = [(t, n) for t, n in scans if n is not None and n >= large_rows]
+    if not large:
+        return sql, None
+    what = ", ".join(f"'{t}' (~{n:,} rows)" for t, n in large)
+    if mode == "limit" and not (_AGGREGATE_RE.match(bare) and not re.search(r"\bgroup\s+by\b", bare, re.I)):
+        # On its own line so a trailing -- comment cannot swallow it
+        limited = f"{sql.strip().rstrip(';').rstrip()}\nLIMIT {preview_rows}"
+        return limited, f"Full scan of {what}; results capped at {preview_rows:,} rows. Add a LIMIT to see more."
+    return sql, f"Full scan of {what}."
@@ -0,0 +1,166 @@
+import csv
+import io
+import os
+import zlib
+
+# Bytes just before the saved offset that must be unchanged for growth to
+# count as an append
+CHECK_BYTES = 4096
+MAX_HEADER_BYTES = 1024 * 1024
+
+
+class _Prefix(io.RawIOBase):
+    # The first `limit` bytes of a file, so a load never reads rows that
+    # were appended after its offset was taken
+    def __init__(self, file_path, limit):
+        self._file = open(file_path, "rb")
+        self._left = limit
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self._file.readinto(memoryview(buffer)[:min(len(buffer), self._left)])
+        self._left -= n
+        return n
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+# ----------------- Tail State -------------------
+# Where a loaded CSV ended: everything before offset has been parsed. The
+# first load includes a last line without a newline (partial); poll() only
+# takes complete lines and leaves the rest for the next poll. poll() compares
+# size and mtime; growth counts as an append only while the header line and
+# the bytes just before offset are unchanged and a partial first-load line
+# was not extended. Anything else (truncation, rewrite) asks for a full
+# reload.
+class CsvTail:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        # Table or frame name the rows were loaded as
+        self.table = None
+        self.header = b""
+        self.offset = 0
+        self.size = 0
+        self.mtime_ns = 0
+        self.check = 0
+        self.partial = False
+
+    @classmethod
+    def start(cls, file_path):
+        tail = cls(file_path)
+        st = os.stat(file_path)
+        with open(file_path, "rb") as f:
+            head = f.read(min(st.st_size, MAX_HEADER_BYTES))
+            tail.header = head[:head.find(b"\n") + 1] if b"\n" in head else head
+            tail.offset = st.st_size
+            tail.partial = _ends_partial(f, st.st_size)
+            tail.check = _crc_before(f, tail.offset)
+        tail.size, tail.mtime_ns = st.st_size, st.st_mtime_ns
+        return tail
+
+    def open_prefix(self, text=False):
+        # Binary (or text, for the csv module) stream of the bytes up to offset
+        raw = io.BufferedReader(_Prefix(self.file_path, self.offset))
+        if text:
+            return io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace", newline="")
+        return raw
+
+    def read_frame(self):
+        import pandas as pd
+        with self.open_prefix() as f:
+            return pd.read_csv(f)
+
+    def rows(self):
+        # Header plus rows up to offset, in loader.read_rows form
+        with self.open_prefix(text=True) as f:
+            yield from csv.reader(f)
+
+    def invalidate(self):
+        # The next poll asks for a full reload
+        self.size, self.check = -1, None
+
+    def changed(self):
+        try:
+            st = os.stat(self.file_path)
+        except OSError:
+            return False
+        return (st.st_size, st.st_mtime_ns) != (self.size, self.mtime_ns)
+
+    def poll(self):
+        # Returns ("same", b""), ("append", bytes of complete new lines) or
+        # ("reload", b"")
+        st = os.stat(self.file_path)
+        if (st.st_size, st.st_mtime_ns) == (self.size, self.mtime_ns):
+            return "same", b""
+        if st.st_size < self.offset:
+            return "reload", b""
+        with open(self.file_path, "rb") as f:
+            if f.read(len(self.header)) != self.header or _crc_before(f, self.offset) != self.check:
+                return "reload", b""
+            f.seek(self.offset)
+            data = f.read(st.st_size - self.offset)
+            if self.partial:
+                head = data.split(b"\n", 1)[0]
+                if head.strip(b"\r"):
+                    # The last row of the first load was still being written
+                    return "reload", b""
+                if b"\n" in data:
+                    self.offset += len(head) + 1
+                    data = data[len(head) + 1:]
+                    self.partial = False
+            # A line still being written stays after offset until its
+            # newline arrives
+            data = data[:data.rfind(b"\n") + 1]
+            self.offset += len(data)
+            self.check = _crc_before(f, self.offset)
+        self.size, self.mtime_ns = st.st_size, st.st_mtime_ns
+        return ("append" if data else "same"), data
+
+
+def _ends_partial(f, size):
+    if not size:
+        return False
+    f.seek(size - 1)
+    return f.read(1) != b"\n"
+
+
+def _crc_before(f, offset):
+    start = max(0, offset - CHECK_BYTES)
+    f.seek(start)
+    return zlib.crc32(f.read(offset - start))
+
+
+# ----------------- Appending -------------------
+def parse_frame(data, columns):
+    # New lines parsed like the original read_csv, minus the header
+    import pandas as pd
+    return pd.read_csv(io.BytesIO(data), header=None, names=list(columns), index_col=False)
+
+
+def parse_rows(data):
+    return list(csv.reader(io.StringIO(data.decode("utf-8", errors="replace"), newline="")))
+
+
+def append_frame(frame, new, compact_columns=False):
+    # Column by column so categoricals stay categorical (new values become
+    # new categories) and numbers widen only as far as the new rows need
+    import pandas as pd
+    columns = {}
+    for name in frame.columns:
+        old, add = frame[name], new[name].reset_index(drop=True)
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            values = add.astype(object).where(add.isna(), add.astype(str))
+            extra = pd.Index(values.dropna().unique()).difference(old.cat.categories)
+            dtype = pd.CategoricalDtype(old.cat.categories.append(extra.astype(old.cat.categories.dtype)))
+            merged = pd.concat([old.astype(dtype), values.astype(dtype)], ignore_index=True)
+        else:
+            merged = pd.concat([old, add], ignore_index=True)
+            if compact_columns:
+                import compact
+                merged = compact.compact_column(merged)
+        columns[name] = merged
+    return pd.DataFrame(columns, columns=frame.columns, copy=False)
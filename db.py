@@ -0,0 +1,236 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Applied to every pooled connection. Negative cache_size is in KiB.
+PRAGMAS = {
+    "cache_size": -65536,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+}
+FETCH_SIZE = 1000
+# SQLite VM steps between cancel checks
+PROGRESS_STEPS = 10000
+READ_ONLY_PREFIXES = ("select", "with", "explain")
+
+
+def quote_ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def is_read_only(sql):
+    return sql.lstrip().lower().startswith(READ_ONLY_PREFIXES)
+
+
+def _open(db_path, readonly, pragmas):
+    if readonly and db_path != ":memory:":
+        uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    if readonly:
+        conn.execute("PRAGMA query_only=ON")
+    return conn
+
+
+# ----------------- Connection Pool -------------------
+# Idle connections are kept per (db path, read-only) and handed out to one
+# user at a time, so they can be shared by worker threads.
+class ConnectionPool:
+    def __init__(self, pragmas=None, max_idle=4):
+        self.pragmas = dict(PRAGMAS if pragmas is None else pragmas)
+        self.max_idle = max_idle
+        self._idle = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def _key(self, db_path, readonly):
+        return (os.path.abspath(db_path) if db_path != ":memory:" else db_path, bool(readonly))
+
+    def acquire(self, db_path, readonly=True):
+        key = self._key(db_path, readonly)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+        conn = _open(db_path, readonly, self.pragmas)
+        with self._lock:
+            self._keys[id(conn)] = key
+        return conn
+
+    def release(self, conn):
+        conn.set_progress_handler(None, 0)
+        with self._lock:
+            key = self._keys.get(id(conn))
+            idle = self._idle.setdefault(key, []) if key else None
+            if idle is not None and len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+            self._keys.pop(id(conn), None)
+        conn.close()
+
+    @contextmanager
+    def connection(self, db_path, readonly=True):
+        conn = self.acquire(db_path, readonly)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self, db_path=None):
+        with self._lock:
+            keys = [k for k in self._idle if db_path is None or k[0] == os.path.abspath(db_path)]
+            conns = [c for k in keys for c in self._idle.pop(k)]
+            for conn in conns:
+                self._keys.pop(id(conn), None)
+        for conn in conns:
+            conn.close()
+
+
+pool = ConnectionPool()
+
+
+# ----------------- Streaming Results -------------------
+# Wraps a cursor on a pooled connection; the connection goes back to the
+# pool once the rows are exhausted or close() is called.
+class ResultStream:
+    def __init__(self, pool, conn, cursor):
+        self._pool = pool
+        self.connection = conn
+        self.cursor = cursor
+        self.description = cursor.description
+        self.closed = False
+        if self.description is None:
+            # Statements without a result set free the connection right away
+            self.close()
+
+    @property
+    def headers(self):
+        return [d[0] for d in self.description] if self.description else []
+
+    def fetchmany(self, size=FETCH_SIZE):
+        if self.closed:
+            return []
+        rows = self.cursor.fetchmany(size)
+        if not rows:
+            self.close()
+        return rows
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany()
+            if not rows:
+                return
+            yield from rows
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.cursor.close()
+            self._pool.release(self.connection)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ----------------- SQL Runner -------------------
+def watch_cancel(conn, cancel):
+    # A set cancel Event aborts the running statement with "interrupted"
+    if cancel is not None:
+        conn.set_progress_handler(cancel.is_set, PROGRESS_STEPS)
+
+
+def run_sql(sql, db_path, cancel=None):
+    readonly = is_read_only(sql)
+    try:
+        conn = pool.acquire(db_path, readonly)
+    except Exception as e:
+        return str(e), []
+    watch_cancel(conn, cancel)
+    try:
+        cursor = conn.execute(sql)
+        if not readonly:
+            conn.commit()
+    except Exception as e:
+        pool.release(conn)
+        return str(e), []
+    stream = ResultStream(pool, conn, cursor)
+    return stream, stream.headers
+
+
+def count_rows(sql, db_path, cancel=None):
+    if not sql.lstrip().lower().startswith(("select", "with")):
+        return None
+    try:
+        with pool.connection(db_path) as conn:
+            watch_cancel(conn, cancel)
+            return conn.execute(f"SELECT COUNT(*) FROM ({sql.strip().rstrip(';')})").fetchone()[0]
+    except sqlite3.Error:
+        return None
+
+
+# ----------------- Schema Cache -------------------
+# Table and column lists per database, read from sqlite_master and
+# PRAGMA table_info without touching any rows. An entry is dropped as soon as
+# PRAGMA schema_version moves.
+class SchemaCache:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, conn, db_path):
+        key = os.path.abspath(db_path)
+        version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["version"] == version:
+                return entry
+        rows = conn.execute("SELECT name FROM sqlite_master WHERE type='table';").fetchall()
+        entry = {"version": version,
+                 "tables": [row[0] for row in rows if not row[0].startswith('sqlite_')],
+                 "columns": {}}
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def tables(self, db_path):
+        with pool.connection(db_path) as conn:
+            return list(self._entry(conn, db_path)["tables"])
+
+    def table_info(self, db_path, table):
+        with pool.connection(db_path) as conn:
+            entry = self._entry(conn, db_path)
+            info = entry["columns"].get(table)
+            if info is None:
+                rows = conn.execute(f"PRAGMA table_info({quote_ident(table)})").fetchall()
+                info = [(row[1], row[2]) for row in rows]
+                entry["columns"][table] = info
+        return info
+
+    def columns(self, db_path, table):
+        return [name for name, _ in self.table_info(db_path, table)]
+
+    def invalidate(self, db_path=None):
+        with self._lock:
+            if db_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(db_path), None)
+
+
+schema = SchemaCache()
+
+
+def get_tables(db_path):
+    return schema.tables(db_path)
+
+
+def get_columns(db_path, table):
+    return schema.columns(db_path, table)
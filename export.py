@@ -0,0 +1,169 @@
+import csv
+import gzip
+import os
+
+from db import is_read_only, run_sql
+
+EXPORT_CHUNK = 10000
+FORMATS = {".csv": "csv", ".gz": "gzip", ".parquet": "parquet"}
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def format_for(path):
+    lower = path.lower()
+    for ext, fmt in FORMATS.items():
+        if lower.endswith(ext):
+            return fmt
+    return "csv"
+
+
+# ----------------- Writers -------------------
+# Each writer takes an iterator of row-chunks so only one chunk is in memory.
+def _write_csv(path, headers, chunks, compress):
+    opener = gzip.open if compress else open
+    with opener(path, "wt", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for rows in chunks:
+            writer.writerows(rows)
+
+
+def _text(value):
+    try:
+        missing = value is None or value != value
+    except TypeError:
+        # pandas.NA
+        missing = True
+    return None if missing else str(value)
+
+
+def _chunk_array(pa, values):
+    # One column of one chunk; values that do not share a type become
+    # doubles if they are all numbers, else text
+    try:
+        return pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        pass
+    try:
+        return pa.array(values, type=pa.float64(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([_text(v) for v in values], type=pa.string())
+
+
+def _common_type(pa, old, new):
+    if old == new or pa.types.is_null(new):
+        return old
+    if pa.types.is_null(old):
+        return new
+    if pa.types.is_integer(old) and pa.types.is_integer(new):
+        return pa.int64()
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in (old, new)):
+        return pa.float64()
+    return pa.string()
+
+
+def _widen(pa, pq, writer, path, schema):
+    # Copies the row groups written so far into a file with the wider schema,
+    # one row group at a time
+    writer.close()
+    narrow = path + ".narrow"
+    os.replace(path, narrow)
+    try:
+        writer = pq.ParquetWriter(path, schema)
+        try:
+            with pq.ParquetFile(narrow) as written:
+                for i in range(written.num_row_groups):
+                    writer.write_table(written.read_row_group(i).cast(schema))
+        except BaseException:
+            writer.close()
+            raise
+    finally:
+        os.remove(narrow)
+    return writer
+
+
+def _write_parquet(path, headers, chunks):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs the pyarrow package.")
+    # SQLite keeps a type per value, not per column, so a column's type is
+    # only known once every row has been seen. Columns start out NULL-typed
+    # and are widened (ints to doubles, mixed values to text) when a chunk
+    # does not fit.
+    schema = pa.schema([pa.field(str(h), pa.null()) for h in headers])
+    writer = None
+    try:
+        for rows in chunks:
+            if not rows:
+                continue
+            arrays = [_chunk_array(pa, list(col)) for col in zip(*rows)]
+            types = [_common_type(pa, field.type, a.type) for field, a in zip(schema, arrays)]
+            if types != schema.types:
+                schema = pa.schema([pa.field(field.name, t) for field, t in zip(schema, types)])
+                if writer is not None:
+                    writer = _widen(pa, pq, writer, path, schema)
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema)
+            arrays = [a.cast(t) for a, t in zip(arrays, types)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        if writer is None:
+            schema = pa.schema([pa.field(str(h), pa.string()) for h in headers])
+            writer = pq.ParquetWriter(path, schema)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _tracked(chunks, progress, cancel):
+    written = 0
+    for rows in chunks:
+        if cancel is not None and cancel.is_set():
+            raise ExportCancelled()
+        yield rows
+        written += len(rows)
+        if progress:
+            progress(written)
+
+
+def export_chunks(path, headers, chunks, progress=None, cancel=None):
+    # Written to a .part file next to the target and renamed once complete,
+    # so a failed or cancelled export never leaves a truncated file behind
+    fmt = format_for(path)
+    chunks = _tracked(chunks, progress, cancel)
+    partial = path + ".part"
+    try:
+        if fmt == "parquet":
+            _write_parquet(partial, headers, chunks)
+        else:
+            _write_csv(partial, headers, chunks, compress=(fmt == "gzip"))
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return path
+
+
+# ----------------- Sources -------------------
+def export_query(sql, db_path, path, progress=None, cancel=None, chunk_size=EXPORT_CHUNK):
+    # Re-runs the query and writes straight from the cursor; only read-only
+    # statements, which run on a read-only connection
+    if not is_read_only(sql):
+        raise RuntimeError("Only SELECT queries can be exported.")
+    stream, headers = run_sql(sql, db_path, cancel=cancel)
+    if isinstance(stream, str):
+        raise RuntimeError(stream)
+    with stream:
+        chunks = iter(lambda: stream.fetchmany(chunk_size), [])
+        return export_chunks(path, headers, chunks, progress, cancel)
+
+
+def export_frame(frame, path, progress=None, cancel=None, chunk_size=EXPORT_CHUNK):
+    def chunks():
+        for start in range(0, len(frame), chunk_size):
+            yield list(frame.iloc[start:start + chunk_size].itertuples(index=False, name=None))
+    return export_chunks(path, [str(c) for c in frame.columns], chunks(), progress, cancel)
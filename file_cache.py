@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".askdb_cache")
+MAX_CACHE_BYTES = 2 * 1024 ** 3
+# Text columns with fewer distinct values than this share come back as categoricals
+CATEGORY_RATIO = 0.5
+META_FILE = "meta.json"
+
+
+# ----------------- Cache Keys -------------------
+def _path_key(file_path):
+    return hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+
+
+def _entry_name(file_path, variant=""):
+    # variant separates snapshots of the same file made by different readers
+    st = os.stat(file_path)
+    version = hashlib.sha1(f"{st.st_mtime_ns}|{st.st_size}|{variant}".encode()).hexdigest()[:16]
+    return f"{_path_key(file_path)}-{version}"
+
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+# ----------------- Snapshot Format -------------------
+# One .npy file per column: numeric/bool/datetime columns are stored as-is
+# and memory-mapped on load; nullable ints as values plus a NULL mask;
+# everything else is factorized into int32 codes (memory-mapped) plus a small
+# pickled array of distinct values.
+def _write_snapshot(frame, path):
+    meta = {"rows": len(frame), "columns": []}
+    for i, name in enumerate(frame.columns):
+        series = frame[name]
+        kind = series.dtype.kind
+        col = {"name": name if isinstance(name, (str, int, float)) else str(name)}
+        if isinstance(series.array, pd.arrays.IntegerArray):
+            np_dtype = series.dtype.numpy_dtype
+            np.save(os.path.join(path, f"c{i}.npy"), series.to_numpy(dtype=np_dtype, na_value=0))
+            np.save(os.path.join(path, f"c{i}.mask.npy"), series.isna().to_numpy())
+            col.update(kind="masked", dtype=str(series.dtype))
+        elif kind in "biuf":
+            np.save(os.path.join(path, f"c{i}.npy"), series.to_numpy())
+            col["kind"] = "array"
+        elif kind == "M" and getattr(series.dtype, "tz", None) is None:
+            np.save(os.path.join(path, f"c{i}.npy"), series.to_numpy().view("i8"))
+            col.update(kind="datetime", dtype=str(series.dtype))
+        else:
+            codes, uniques = pd.factorize(series)
+            np.save(os.path.join(path, f"c{i}.npy"), codes.astype(np.int32))
+            np.save(os.path.join(path, f"c{i}.cats.npy"), np.asarray(uniques, dtype=object),
+                    allow_pickle=True)
+            col.update(kind="codes", categorical=len(uniques) < CATEGORY_RATIO * max(len(series), 1))
+        meta["columns"].append(col)
+    with open(os.path.join(path, META_FILE), "w") as f:
+        json.dump(meta, f)
+
+
+def _read_snapshot(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    data = {}
+    for i, col in enumerate(meta["columns"]):
+        values = np.load(os.path.join(path, f"c{i}.npy"), mmap_mode="r")
+        if col["kind"] == "array":
+            data[col["name"]] = values
+        elif col["kind"] == "masked":
+            mask = np.load(os.path.join(path, f"c{i}.mask.npy"))
+            data[col["name"]] = pd.arrays.IntegerArray(values, mask)
+        elif col["kind"] == "datetime":
+            data[col["name"]] = np.asarray(values).view(col["dtype"])
+        else:
+            uniques = np.load(os.path.join(path, f"c{i}.cats.npy"), allow_pickle=True)
+            codes = np.asarray(values)
+            if col["categorical"]:
+                data[col["name"]] = pd.Categorical.from_codes(codes, pd.Index(uniques, dtype=object))
+            else:
+                out = np.empty(len(codes), dtype=object)
+                out[:] = uniques.take(codes, mode="clip") if len(uniques) else np.nan
+                out[codes < 0] = np.nan
+                data[col["name"]] = out
+    return pd.DataFrame(data, columns=[c["name"] for c in meta["columns"]], copy=False)
+
+
+# ----------------- Public API -------------------
+def load(file_path, cache_dir=CACHE_DIR, variant=""):
+    entry = os.path.join(cache_dir, _entry_name(file_path, variant))
+    if not os.path.exists(os.path.join(entry, META_FILE)):
+        return None
+    try:
+        frame = _read_snapshot(entry)
+    except (OSError, ValueError, KeyError):
+        shutil.rmtree(entry, ignore_errors=True)
+        return None
+    # Touch the entry so eviction is least-recently-used
+    os.utime(os.path.join(entry, META_FILE))
+    return frame
+
+
+def store(file_path, frame, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, variant=""):
+    os.makedirs(cache_dir, exist_ok=True)
+    name = _entry_name(file_path, variant)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=cache_dir)
+    try:
+        _write_snapshot(frame, tmp)
+        # Older snapshots of the same file are stale now
+        prefix = _path_key(file_path) + "-"
+        for other in os.listdir(cache_dir):
+            if other.startswith(prefix):
+                shutil.rmtree(os.path.join(cache_dir, other), ignore_errors=True)
+        os.replace(tmp, os.path.join(cache_dir, name))
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    evict(cache_dir, max_bytes)
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    if not os.path.isdir(cache_dir):
+        return
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        meta = os.path.join(path, META_FILE)
+        if name.startswith(".tmp-") or not os.path.exists(meta):
+            continue
+        entries.append((os.path.getmtime(meta), _dir_size(path), path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+
+def read_frame(file_path, reader, cache_dir=CACHE_DIR, variant=""):
+    # reader(file_path) parses the file when no valid snapshot exists
+    frame = load(file_path, cache_dir, variant)
+    if frame is not None:
+        return frame
+    frame = reader(file_path)
+    try:
+        store(file_path, frame, cache_dir, variant=variant)
+    except (OSError, ValueError, TypeError):
+        # A failed snapshot only costs the next load a re-parse
+        pass
+    return frame
+
+
+def clear(cache_dir=CACHE_DIR):
+    shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,234 @@
+import re
+import sqlite3
+
+import pandas as pd
+
+# ----------------- SQL Subset Parser -------------------
+# Covers what NL2SQL generates: a projection or one aggregate, a WHERE made
+# of AND-ed comparisons, BETWEEN and LIKE, and ORDER BY ... LIMIT.
+_IDENT = r'(?:"[^"]+"|`[^`]+`|\[[^\]]+\]|\w+)'
+_LITERAL = r"(?:'(?:[^']|'')*'|-?\d+(?:\.\d+)?)"
+
+_SELECT_RE = re.compile(rf"""
+    ^\s*select\s+(?P<proj>.+?)\s+from\s+(?P<table>{_IDENT})
+    (?:\s+where\s+(?P<where>.+?))?
+    (?:\s+order\s+by\s+(?P<order>{_IDENT})(?:\s+(?P<dir>asc|desc))?)?
+    (?:\s+limit\s+(?P<limit>\d+))?
+    \s*;?\s*$""", re.I | re.S | re.X)
+_AGG_RE = re.compile(rf"^(?P<fn>count|sum|max|min|avg)\s*\(\s*(?P<col>\*|{_IDENT})\s*\)$", re.I)
+_COND_RE = re.compile(rf"""
+    \s*(?P<col>{_IDENT})\s*(?:
+        (?P<op><=|>=|!=|<>|==|=|<|>)\s*(?P<val>{_LITERAL})
+      | between\s+(?P<lo>{_LITERAL})\s+and\s+(?P<hi>{_LITERAL})
+      | (?P<neg>not\s+)?like\s+(?P<pat>'(?:[^']|'')*')
+    )""", re.I | re.X)
+_AND_RE = re.compile(r"\s+and\s+", re.I)
+
+
+class Unsupported(Exception):
+    pass
+
+
+def _unquote_ident(name):
+    if name[0] in '"`[':
+        return name[1:-1]
+    return name
+
+
+def _literal(text):
+    if text.startswith("'"):
+        return text[1:-1].replace("''", "'")
+    return float(text) if "." in text else int(text)
+
+
+def parse(sql):
+    m = _SELECT_RE.match(sql)
+    if not m:
+        raise Unsupported(sql)
+    query = {"table": _unquote_ident(m.group("table")),
+             "proj": None, "agg": None, "where": [], "order": None,
+             "desc": (m.group("dir") or "").lower() == "desc",
+             "limit": int(m.group("limit")) if m.group("limit") else None}
+    proj = m.group("proj").strip()
+    agg = _AGG_RE.match(proj)
+    if agg:
+        query["agg"] = (agg.group("fn").upper(), _unquote_ident(agg.group("col")))
+    elif proj != "*":
+        names = [p.strip() for p in proj.split(",")]
+        if not all(re.fullmatch(_IDENT, n) for n in names):
+            raise Unsupported(proj)
+        query["proj"] = [_unquote_ident(n) for n in names]
+    if m.group("order"):
+        query["order"] = _unquote_ident(m.group("order"))
+
+    where = m.group("where")
+    pos = 0
+    while where is not None and pos < len(where):
+        c = _COND_RE.match(where, pos)
+        if not c:
+            raise Unsupported(where)
+        col = _unquote_ident(c.group("col"))
+        if c.group("op"):
+            query["where"].append((col, c.group("op"), _literal(c.group("val"))))
+        elif c.group("lo"):
+            query["where"].append((col, "between", (_literal(c.group("lo")), _literal(c.group("hi")))))
+        else:
+            query["where"].append((col, "not like" if c.group("neg") else "like", _literal(c.group("pat"))))
+        pos = c.end()
+        if pos < len(where):
+            sep = _AND_RE.match(where, pos)
+            if not sep:
+                raise Unsupported(where)
+            pos = sep.end()
+    return query
+
+
+# ----------------- Vectorized Executor -------------------
+def _column(frame, name):
+    # NL2SQL works on lower-cased names; resolve them like SQLite would
+    if name in frame.columns:
+        return frame[name]
+    lookup = {str(c).lower(): c for c in frame.columns}
+    if name.lower() not in lookup:
+        raise KeyError(f"no such column: {name}")
+    return frame[lookup[name.lower()]]
+
+
+def _is_number(value):
+    if isinstance(value, (int, float)):
+        return True
+    try:
+        float(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _on_categories(series, fn):
+    # Evaluates fn once per distinct category instead of once per row
+    hits = fn(pd.Series(series.cat.categories)).fillna(False).to_numpy(dtype=bool)
+    codes = series.cat.codes.to_numpy()
+    return pd.Series((codes >= 0) & hits[codes], index=series.index)
+
+
+def _compare(series, op, value):
+    # Numeric comparison when either side is numeric, mirroring column affinity
+    if isinstance(series.dtype, pd.CategoricalDtype) and len(series.cat.categories):
+        return _on_categories(series, lambda cats: _compare(cats, op, value))
+    if _is_number(value) and (pd.api.types.is_numeric_dtype(series) or not isinstance(value, str)):
+        series = pd.to_numeric(series, errors="coerce")
+        value = float(value)
+    elif series.dtype == object:
+        series = series.astype(str).where(series.notna())
+    if op in ("=", "=="):
+        return series == value
+    if op in ("!=", "<>"):
+        return series.notna() & (series != value)
+    if op == "<":
+        return series < value
+    if op == ">":
+        return series > value
+    if op == "<=":
+        return series <= value
+    return series >= value
+
+
+def _like(series, pattern):
+    if isinstance(series.dtype, pd.CategoricalDtype) and len(series.cat.categories):
+        return _on_categories(series, lambda cats: _like_text(cats, pattern))
+    return _like_text(series, pattern).fillna(False).astype(bool)
+
+
+def _like_text(series, pattern):
+    text = series.astype(str).where(series.notna())
+    core = pattern.strip("%")
+    if "%" not in core and "_" not in core:
+        # SQLite LIKE is case-insensitive for ASCII
+        if pattern.startswith("%") and pattern.endswith("%"):
+            return text.str.contains(core, case=False, regex=False)
+        if pattern.endswith("%"):
+            return text.str.lower().str.startswith(core.lower())
+        if pattern.startswith("%"):
+            return text.str.lower().str.endswith(core.lower())
+    regex = "^" + "".join(".*" if ch == "%" else "." if ch == "_" else re.escape(ch) for ch in pattern) + "$"
+    return text.str.match(regex, case=False)
+
+
+def _mask(frame, conditions):
+    mask = None
+    for col, op, value in conditions:
+        series = _column(frame, col)
+        if op == "between":
+            part = _compare(series, ">=", value[0]) & _compare(series, "<=", value[1])
+        elif op == "like":
+            part = _like(series, value)
+        elif op == "not like":
+            part = series.notna() & ~_like(series, value)
+        else:
+            part = _compare(series, op, value)
+        mask = part if mask is None else mask & part
+    # Nullable columns compare to <NA>; NULL never matches, as in SQLite
+    return mask.fillna(False).astype(bool)
+
+
+def _aggregate(frame, fn, col):
+    if fn == "COUNT":
+        value = len(frame) if col == "*" else int(_column(frame, col).count())
+        return pd.DataFrame({f"COUNT({col})": [value]})
+    values = _column(frame, col).dropna()
+    if fn in ("SUM", "AVG"):
+        values = pd.to_numeric(values, errors="coerce").dropna()
+    elif not pd.api.types.is_numeric_dtype(values):
+        # MAX/MIN on text compare as text unless every value is numeric
+        numeric = pd.to_numeric(values, errors="coerce")
+        values = numeric if numeric.notna().all() else values.astype(str)
+    if values.empty:
+        value = None
+    else:
+        value = {"SUM": values.sum, "AVG": values.mean, "MAX": values.max, "MIN": values.min}[fn]()
+    return pd.DataFrame({f"{fn}({col})": [value]})
+
+
+def execute(frame, sql):
+    query = parse(sql)
+    if query["where"]:
+        frame = frame[_mask(frame, query["where"])]
+    if query["agg"]:
+        return _aggregate(frame, *query["agg"])
+    if query["order"]:
+        series = _column(frame, query["order"])
+        n = query["limit"]
+        if n is not None and query["desc"] and pd.api.types.is_numeric_dtype(series):
+            frame = frame.loc[series.nlargest(n).index]
+        elif n is not None and pd.api.types.is_numeric_dtype(series):
+            frame = frame.loc[series.nsmallest(n).index]
+        else:
+            frame = frame.loc[series.sort_values(ascending=not query["desc"], kind="stable").index]
+    if query["limit"] is not None:
+        frame = frame.head(query["limit"])
+    if query["proj"]:
+        frame = pd.concat([_column(frame, c) for c in query["proj"]], axis=1)
+    return frame
+
+
+# ----------------- In-memory SQLite Fallback -------------------
+# Anything outside the subset runs against a copy of the frame registered in
+# an in-memory database; the copy is kept while the same frame is queried.
+_memory_db = {"frame": None, "table": None, "conn": None}
+
+
+def _sqlite_execute(frame, table, sql):
+    if _memory_db["frame"] is not frame or _memory_db["table"] != table:
+        if _memory_db["conn"] is not None:
+            _memory_db["conn"].close()
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        frame.to_sql(table, conn, index=False)
+        _memory_db.update(frame=frame, table=table, conn=conn)
+    return pd.read_sql_query(sql, _memory_db["conn"])
+
+
+def run_frame_sql(frame, sql, table="data"):
+    try:
+        return execute(frame, sql)
+    except Unsupported:
+        return _sqlite_execute(frame, table, sql)
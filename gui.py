@@ -1,42 +1,36 @@
+import startup
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import pyttsx3
-import speech_recognition as sr
-import sqlite3
-import csv
-from nl2sql import NL2SQL
-import pandas as pd
+from nl2sql import get_translator, translators
+from result_view import VirtualResultView, FrameSource, CursorSource, ListSource
+from result_cache import results, frame_size
+from db import run_sql, count_rows, get_tables, get_columns, schema, is_read_only
+from cost_guard import Budget, guard
+from csv_tail import CsvTail
+import cost_guard
+import nl2sql
+import loader
+import export
+from speech import SpeechWorker, Listener
+from workers import BackgroundRunner
+import timing
 import os
-import matplotlib.pyplot as plt
+import sqlite3
+import sys
+import time
+
+# pandas, numpy and matplotlib (and the modules built on them) are imported
+# where they are used, mostly on worker threads, and preloaded after the
+# window is up.
+startup.mark("imports")
 
 # ----------------- Voice Functions -------------------
-engine = pyttsx3.init()
+# TTS and recognition run on their own threads; speak() never blocks the UI
+speaker = SpeechWorker()
+listener = Listener(speaker=speaker)
+
 def speak(text):
-    engine.say(text)
-    engine.runAndWait()
-
-def listen():
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        speak("Speak your query now.")
-        audio = recognizer.listen(source)
-    try:
-        return recognizer.recognize_google(audio)
-    except:
-        return "Could not understand audio."
-
-# ----------------- SQL Runner -------------------
-def run_sql(sql, db_path):
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute(sql)
-        results = cursor.fetchall()
-        headers = [desc[0] for desc in cursor.description] if cursor.description else []
-        conn.close()
-        return results, headers
-    except Exception as e:
-        return str(e), []
+    speaker.say(text)
 
 # ----------------- GUI State -------------------
 df = None
@@ -44,6 +38,38 @@ columns = []
 table_name = ""
 tables = []
 current_data = None
+current_stream = None
+current_task = None
+current_trace = None
+# Bumped whenever df is replaced; part of the result cache key for frames
+df_version = 0
+# Key of the frame's value index: bumped on every load, but while watch mode
+# appends rows at most every INDEX_REFRESH_S
+index_version = 0
+# (task, source, table) of the latest value index build
+index_build = None
+index_built_at = 0.0
+INDEX_REFRESH_S = 30
+# F9 (or ASKDB_PROFILE=1 at startup) profiles the next query with cProfile
+profile_next = os.environ.get("ASKDB_PROFILE") == "1"
+TTS_POLL_MS = 100
+TTS_WAIT_MS = 30000
+# CSV/Excel frames get downcast numerics and categorical text (ASKDB_COMPACT=0 turns it off)
+compact_frames = os.environ.get("ASKDB_COMPACT", "1") != "0"
+# ASKDB_TRACE=1 also measures each compacted load (deep memory usage, slow on
+# wide text frames) and logs the per-column report to the trace file
+trace_loads = os.environ.get("ASKDB_TRACE") == "1"
+# Cost guard for SQLite queries: ASKDB_GUARD=off|warn|limit, budgets in seconds / rows (0 = none)
+guard_mode = os.environ.get("ASKDB_GUARD", "limit")
+time_budget = float(os.environ.get("ASKDB_TIME_BUDGET", cost_guard.TIME_BUDGET_S))
+row_budget = int(os.environ.get("ASKDB_ROW_BUDGET", cost_guard.ROW_BUDGET))
+# Watch mode: the loaded CSV is polled and appended rows are added in place
+# (ASKDB_WATCH=1 turns it on at startup)
+watched = None
+watching = os.environ.get("ASKDB_WATCH") == "1"
+watch_busy = False
+watch_job = None
+WATCH_POLL_MS = 1000
 
 # ----------------- Handlers -------------------
 def update_table_dropdown(tables):
@@ -53,17 +79,133 @@ def update_table_dropdown(tables):
     for t in tables:
         menu.add_command(label=t, command=lambda value=t: table_var.set(value))
 
-def load_table_data(db_path, table):
-    global df, columns, table_name
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
-    conn.close()
-    columns = list(df.columns)
-    table_name = table
-    df.fillna('', inplace=True)
+# ----------------- Background Tasks -------------------
+def start_task(name, fn, on_done, on_error=None, on_discard=None):
+    global current_task
+    if current_task is not None:
+        current_task.cancel()
+
+    def finished(callback):
+        def run(*args):
+            global current_task
+            if current_task is task:
+                current_task = None
+                cancel_btn.config(state="disabled")
+                status_bar.config(text="Ready")
+            if callback:
+                callback(*args)
+        return run
+
+    def failed(e):
+        messagebox.showerror("Error", f"{name} failed: {e}")
+
+    def cancelled():
+        status_bar.config(text=f"{name} cancelled")
+
+    task = runner.submit(name, fn, on_done=finished(on_done),
+                         on_error=finished(on_error or failed), on_cancel=finished(cancelled),
+                         on_discard=on_discard)
+    current_task = task
+    cancel_btn.config(state="normal")
+    status_bar.config(text=f"{name}...")
+    return task
+
+# ----------------- Query Tracing -------------------
+def trace_for(stage, query=""):
+    # Continues the current trace until the stage it would record already ran
+    global current_trace
+    if current_trace is None or current_trace.written or current_trace.has(stage):
+        current_trace = timing.QueryTrace(query)
+    return current_trace
+
+def finish_trace(trace, answer):
+    # Speaks the answer, then logs the trace once TTS is done (polled, the
+    # UI thread never waits on the speech thread)
+    status_bar.config(text=trace.summary())
+    start = time.perf_counter()
+    spoken = speaker.say(answer)
+
+    def check(waited=0):
+        if not spoken.is_set() and waited < TTS_WAIT_MS:
+            app.after(TTS_POLL_MS, check, waited + TTS_POLL_MS)
+            return
+        if spoken.is_set() and speaker.available:
+            trace.add("tts", (time.perf_counter() - start) * 1000)
+        timing.write_trace(trace)
+        if trace is current_trace and current_task is None:
+            status_bar.config(text=trace.summary())
+    check()
+
+def fail_trace(trace, error):
+    trace.error = str(error)
+    timing.write_trace(trace)
+    status_bar.config(text=trace.summary())
+
+def traced_work(trace, fn):
+    # Runs this one query under cProfile when profiling was requested
+    global profile_next
+    if not profile_next:
+        return fn
+    profile_next = False
+
+    def work(cancel):
+        result, path, stats = timing.profiled(fn, cancel)
+        trace.profile = path
+        print(stats, file=sys.stderr)
+        return result
+    return work
+
+def toggle_profile_next(event=None):
+    global profile_next
+    profile_next = not profile_next
+    status_bar.config(text="Next query will be profiled" if profile_next else "Profiling off")
+
+# ----------------- Value Index -------------------
+def value_index():
+    # Distinct values of the current table, filled in the background the
+    # first time the table is used
+    global index_build, index_built_at
+    db_path = getattr(app, 'last_db_path', None)
+    if db_path and table_var.get():
+        source, table = os.path.abspath(db_path), table_var.get()
+    elif df is not None:
+        source, table = f"frame:{index_version}", table_name
+    else:
+        return None
+    if index_build is not None and index_build[1:] != (source, table):
+        stop_index_build()
+    index = nl2sql.get_value_index(source, table)
+    if not index.started:
+        index.started = True
+        if db_path:
+            build = lambda cancel: nl2sql.build_value_index_sqlite(index, db_path, table, cancel)
+        else:
+            frame = df
+            build = lambda cancel: nl2sql.build_value_index_frame(index, frame, cancel)
+        task = runner.submit("Indexing values", build, on_error=lambda e: None)
+        index_build, index_built_at = (task, source, table), time.monotonic()
+    return index
+
+def index_building():
+    return index_build is not None and not index_build[0].future.done()
+
+def stop_index_build():
+    # A build still running (or queued on the runner) for a table or file
+    # that is no longer current; its half-built index is dropped so it is
+    # built again if that table comes back
+    global index_build
+    if index_building():
+        task, source, table = index_build
+        task.cancel()
+        nl2sql.drop_value_indexes(source, table)
+    index_build = None
+
+def handle_cancel():
+    if current_task is not None:
+        current_task.cancel()
+        status_bar.config(text=f"Cancelling {current_task.name.lower()}...")
 
 def handle_file_select():
-    global df, columns, table_name, tables, app
     file_path = filedialog.askopenfilename(
         initialdir=os.getcwd(),
         title="Select database or data file",
@@ -77,48 +219,289 @@ def handle_file_select():
     )
     if not file_path:
         return
+    load_file(file_path)
 
+def load_file(file_path, quiet=False):
+    # quiet: a watch-mode reload, which only reports in the status bar
     ext = os.path.splitext(file_path)[1].lower()
-    if ext == ".csv":
-        df = pd.read_csv(file_path)
-        table_name = os.path.splitext(os.path.basename(file_path))[0]
-        columns = list(df.columns)
-        tables = [table_name]
-        app.last_db_path = None
-    elif ext in [".xlsx", ".xls"]:
-        df = pd.read_excel(file_path)
-        table_name = os.path.splitext(os.path.basename(file_path))[0]
-        columns = list(df.columns)
-        tables = [table_name]
-        app.last_db_path = None
-    elif ext in [".db", ".sqlite"]:
-        conn = sqlite3.connect(file_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = [row[0] for row in cursor.fetchall() if not row[0].startswith('sqlite_')]
-        conn.close()
-        if not tables:
+    if ext not in [".csv", ".xlsx", ".xls", ".db", ".sqlite"]:
+        messagebox.showerror("Error", "Unsupported file format")
+        return
+
+    # Filled by the worker when ASKDB_TRACE is set, read back in done()
+    reports = []
+
+    def compacted(reader):
+        def read(path):
+            import compact
+            frame = reader(path)
+            if not compact_frames:
+                return frame
+            small = compact.compact_frame(frame)
+            if trace_loads:
+                reports.append(compact.memory_report(frame, small))
+            return small
+        return read
+
+    # Parsing runs on a worker thread; globals are only set back on the Tk thread
+    def work(cancel):
+        import pandas as pd
+        import file_cache
+        variant = "compact" if compact_frames else ""
+        if ext == ".csv":
+            # Only the bytes up to the tail offset (the size right now) are
+            # read, so rows appended meanwhile are picked up by the next poll
+            tail = CsvTail.start(file_path)
+        if ext == ".csv" and os.path.getsize(file_path) > loader.LARGE_FILE_BYTES:
+            # Large CSVs are streamed into the workspace database in chunks
+            name = nl2sql.load_file_to_sqlite(file_path, rows=tail.rows(), cancel=cancel)
+            db_path = loader.WORKSPACE_DB
+            return None, name, get_columns(db_path, name), get_tables(db_path), db_path, tail
+        if ext == ".csv":
+            name = loader.table_name_for(file_path)
+            # The snapshot holds the bytes up to the offset, not the file as
+            # it is by the time the cache key is taken
+            frame = file_cache.read_frame(file_path, compacted(lambda path: tail.read_frame()),
+                                          variant=f"{variant}|{tail.offset}")
+            return frame, name, list(frame.columns), [name], None, tail
+        if ext in [".xlsx", ".xls"]:
+            name = loader.table_name_for(file_path)
+            frame = file_cache.read_frame(file_path, compacted(pd.read_excel), variant=variant)
+            return frame, name, list(frame.columns), [name], None, None
+        db_tables = get_tables(file_path)
+        if not db_tables:
+            return None, None, [], [], file_path, None
+        # Only the schema is read here; rows load when a query runs
+        return None, db_tables[0], get_columns(file_path, db_tables[0]), db_tables, file_path, None
+
+    def done(result):
+        global df, df_version, index_version, columns, table_name, tables, watched
+        frame, name, new_columns, new_tables, db_path, tail = result
+        if tail is not None:
+            tail.table = name
+        if not new_tables:
             messagebox.showerror("Error", "No tables found in database.")
             return
-        app.last_db_path = file_path
-        table_name = tables[0]
-        load_table_data(file_path, table_name)
-    else:
-        messagebox.showerror("Error", "Unsupported file format")
+        stop_index_build()
+        nl2sql.drop_value_indexes(f"frame:{index_version}")
+        df, table_name, columns, tables = frame, name, new_columns, new_tables
+        df_version += 1
+        index_version += 1
+        watched = tail
+        app.last_db_path = db_path
+        if db_path:
+            # The file may have changed since its values were indexed
+            nl2sql.drop_value_indexes(os.path.abspath(db_path))
+        update_table_dropdown(tables)
+        value_index()
+        if frame is not None:
+            status_bar.config(text=f"{table_name}: {len(frame):,} rows")
+        if reports:
+            report = reports[-1]
+            before, after = report["bytes_before"].sum() / 1024 ** 2, report["bytes_after"].sum() / 1024 ** 2
+            status_bar.config(text=f"{table_name}: {len(frame):,} rows, {after:,.1f} MiB in memory "
+                                   f"({before:,.1f} MiB before compacting)")
+            trace = timing.QueryTrace(f"load {os.path.basename(file_path)}")
+            trace.source, trace.rows = "file", len(frame)
+            trace.memory = {str(name): [row.dtype_before, row.dtype_after,
+                                        int(row.bytes_before), int(row.bytes_after)]
+                            for name, row in report.iterrows()}
+            timing.write_trace(trace)
+        if quiet:
+            status_bar.config(text=f"{os.path.basename(file_path)} was rewritten; reloaded in full")
+            return
+        speak("Database loaded")
+        messagebox.showinfo("Loaded", f"Loaded table: {table_name}")
+
+    start_task("Loading file", work, done)
+
+def handle_folder_select():
+    global df, df_version, columns, table_name, tables, current_stream, watched
+    folder = filedialog.askdirectory(initialdir=os.getcwd(), title="Select a folder of CSV/Excel files")
+    if not folder:
         return
+    db_path = loader.WORKSPACE_DB
+    # Written by the ingest thread, read by show_progress on the Tk thread
+    finished = []
+    shown = [0]
+
+    def work(cancel):
+        # The process pool runs under a separate `python loader.py` so its
+        # workers never re-import this module (and build another window)
+        import json
+        import subprocess
+        import threading
+        proc = subprocess.Popen([sys.executable, os.path.abspath(loader.__file__), folder, "--db", db_path],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        # Drained on its own thread so a full stderr pipe never stalls the loader
+        errors = []
+        drain = threading.Thread(target=lambda: errors.extend(proc.stderr), daemon=True)
+        drain.start()
+
+        def watch():
+            while proc.poll() is None:
+                if cancel.wait(0.2):
+                    proc.terminate()
+                    return
+        threading.Thread(target=watch, daemon=True).start()
+
+        failed_files = []
+        for line in proc.stdout:
+            record = json.loads(line)
+            if "table" in record:
+                finished.append((record["table"], record["file"], record["rows"]))
+            else:
+                failed_files = record["failed"]
+        proc.wait()
+        drain.join()
+        if proc.returncode != 0 and not cancel.is_set():
+            # The last stderr line is the exception message
+            detail = next((line.strip() for line in reversed(errors) if line.strip()), "")
+            raise RuntimeError(f"loader exited with code {proc.returncode}" + (f": {detail}" if detail else ""))
+        return failed_files
+
+    def add_tables():
+        global tables
+        for table, path, rows in finished[shown[0]:]:
+            if table not in tables:
+                tables = tables + [table]
+                if len(tables) == 1:
+                    update_table_dropdown(tables)
+                else:
+                    table_dropdown["menu"].add_command(label=table, command=lambda value=table: table_var.set(value))
+        shown[0] = len(finished)
+
+    def show_progress():
+        add_tables()
+        if current_task is task:
+            status_bar.config(text=f"Loading folder... {len(finished)} file(s) loaded into {len(tables)} table(s)")
+            app.after(250, show_progress)
 
+    def done(failed_files):
+        add_tables()
+        speak("Folder loaded")
+        message = f"Loaded {len(finished)} file(s) into {len(tables)} table(s)."
+        if failed_files:
+            message += "\n\nCould not read:\n" + "\n".join(os.path.basename(f) for f in failed_files)
+        messagebox.showinfo("Loaded", message)
+
+    # The dropdown now lists workspace tables as they are committed
+    if current_stream is not None:
+        current_stream.close()
+        current_stream = None
+    df, df_version, columns, table_name, tables = None, df_version + 1, [], "", []
+    watched = None
+    app.last_db_path = db_path
+    stop_index_build()
+    nl2sql.drop_value_indexes(os.path.abspath(db_path))
     update_table_dropdown(tables)
-    speak("Database loaded")
-    messagebox.showinfo("Loaded", f"Loaded table: {table_name}")
+    task = start_task("Loading folder", work, done)
+    show_progress()
 
 def on_table_change(*args):
+    global columns, table_name
     if hasattr(app, 'last_db_path') and app.last_db_path and table_var.get():
-        load_table_data(app.last_db_path, table_var.get())
+        # Columns come from the schema cache, so switching tables is instant
+        columns = get_columns(app.last_db_path, table_var.get())
+        table_name = table_var.get()
+        value_index()
     # For CSV/Excel, do nothing (df is already loaded)
 
+# ----------------- Watch Mode -------------------
+def toggle_watch():
+    global watching, watch_job
+    watching = not watching
+    if watching:
+        name = os.path.basename(watched.file_path) if watched else "the next CSV you load"
+        status_bar.config(text=f"Watching {name} for new rows")
+        watch_job = app.after(WATCH_POLL_MS, poll_watched)
+    else:
+        if watch_job is not None:
+            app.after_cancel(watch_job)
+            watch_job = None
+        status_bar.config(text="Watch off")
+
+def poll_watched():
+    # A cheap stat on the Tk thread; parsing happens on a worker. Polls
+    # are skipped while a task runs so a query never sees a half refresh.
+    global watch_job
+    if watched is not None and not watch_busy and current_task is None and watched.changed():
+        refresh_watched(watched)
+    watch_job = app.after(WATCH_POLL_MS, poll_watched)
+
+def refresh_watched(tail):
+    global watch_busy
+    from csv_tail import append_frame, parse_frame, parse_rows
+    watch_busy = True
+    frame, table, db_path = df, tail.table, getattr(app, 'last_db_path', None)
+
+    def work(cancel):
+        # Returns (poll result, new frame or None, rows added)
+        kind, data = tail.poll()
+        if kind != "append":
+            return kind, None, 0
+        if frame is not None:
+            new = parse_frame(data, frame.columns)
+            return kind, append_frame(frame, new, compact_columns=compact_frames), len(new)
+        return kind, None, loader.append_rows_to_sqlite(parse_rows(data), table, db_path)
+
+    def done(result):
+        global df, df_version, index_version, watch_busy
+        watch_busy = False
+        kind, new_frame, added = result
+        if tail is not watched:
+            # Another file was loaded meanwhile
+            return
+        if kind == "reload":
+            # Retried by the next poll if the user started something meanwhile
+            if current_task is None:
+                load_file(tail.file_path, quiet=True)
+            return
+        if kind != "append":
+            return
+        # The value index keeps serving the older rows; it is rebuilt at most
+        # every INDEX_REFRESH_S, and never while a build is still running
+        reindex = not index_building() and time.monotonic() - index_built_at >= INDEX_REFRESH_S
+        if new_frame is not None:
+            df = new_frame
+            df_version += 1
+            if reindex:
+                nl2sql.drop_value_indexes(f"frame:{index_version}")
+                index_version += 1
+            total = len(df)
+        else:
+            # Result cache entries go stale on their own (PRAGMA data_version)
+            schema.invalidate(db_path)
+            if reindex:
+                nl2sql.drop_value_indexes(os.path.abspath(db_path))
+            total = None
+        translators.invalidate(table)
+        value_index()
+        rows = f", {total:,} in all" if total is not None else ""
+        status_bar.config(text=f"{os.path.basename(tail.file_path)}: +{added:,} new rows{rows}")
+
+    def failed(e):
+        global watch_busy
+        watch_busy = False
+        # Appended lines that do not parse like the rest of the file
+        tail.invalidate()
+        if tail is watched and current_task is None:
+            load_file(tail.file_path, quiet=True)
+
+    runner.submit("Refreshing file", work, done, failed)
+
 def handle_voice_query():
-    query = listen()
-    nl_var.set(query)
+    # Not a start_task() job: listening must not cancel a running query
+    global current_trace
+    status_bar.config(text="Listening...")
+    trace = current_trace = timing.QueryTrace()
+
+    def heard(query):
+        nl_var.set(query)
+        trace.query = query
+        status_bar.config(text=trace.summary())
+
+    runner.submit("Listening", lambda cancel: listener.listen(trace=trace), on_done=heard)
 
 def handle_generate_sql():
     global df, columns, table_name
@@ -130,11 +513,17 @@ def handle_generate_sql():
     # If user input is already SQL
     if query.lower().startswith(("select", "update", "delete", "insert", "with")):
         sql_var.set(query)
-    elif df is not None and columns:
-        converter = NL2SQL(table_var.get(), [col.lower() for col in columns])
+    elif columns:
+        trace = trace_for("nl2sql")
+        trace.query = query
         try:
-            sql = converter.generate_sql(query)
+            with trace.stage("nl2sql"):
+                converter = get_translator(table_var.get(), [col.lower() for col in columns])
+                converter.use_values(value_index())
+                sql = converter.generate_sql(query)
             sql_var.set(sql)
+            stats = translators.stats()
+            status_bar.config(text=f"{trace.summary()} · SQL cache: {stats['hits']} hits / {stats['misses']} misses")
         except Exception as e:
             messagebox.showerror("Error", f"Query generation failed: {e}")
             sql_var.set("")
@@ -142,104 +531,269 @@ def handle_generate_sql():
         messagebox.showerror("Error", "No data loaded.")
 
 def handle_run_query():
-    global current_data, df, columns, table_name, app
     sql = sql_var.get().strip()
     if not sql:
         messagebox.showwarning("No SQL", "Please generate or enter a SQL query.")
         return
 
-    # Execute via pandas if using CSV/Excel
-    if df is not None:
-        try:
-            if "where" in sql.lower():
-                clause = sql.split("WHERE", 1)[1]
-                clause = clause.split("ORDER BY")[0] if "ORDER BY" in clause else clause
-                clause = clause.replace(";", "").strip()
-                # Convert SQL '=' to pandas '==', but not for >=, <=, !=
-                import re
-                clause = re.sub(r'(?<![<>=!])=(?!=)', '==', clause)
-                df_result = df.query(clause)
+    trace = trace_for("sql" if getattr(app, 'last_db_path', None) else "frame_sql")
+    trace.sql = sql
+
+    # Use sqlite when a database is loaded
+    if getattr(app, 'last_db_path', None):
+        db_path = app.last_db_path
+        trace.source = "sqlite"
+
+        def work(cancel):
+            # Returns (source or error text, headers, open stream, suggestions)
+            budget = Budget(time_budget, row_budget, cancel)
+            run, trace.warning = guard(sql, db_path, guard_mode)
+            trace.sql = run
+            cached, version = results.get_sql(db_path, run)
+            if cached is not None:
+                trace.source = "cache"
+                hdr, rows = cached
+                return ListSource(hdr, rows), hdr, None, []
+            with trace.stage("sql"):
+                res, hdr = run_sql(run, db_path, cancel=budget)
+            if isinstance(res, str):
+                return budget.message() or res, hdr, None, []
+            with trace.stage("count"):
+                total = count_rows(run, db_path, cancel=budget)
+            if budget.is_set():
+                res.close()
+                if budget.exceeded:
+                    return budget.message(), hdr, None, []
+            from index_advisor import advisor
+            suggestions = advisor.record(db_path, run)
+            if total is not None and total <= results.max_rows and not cancel.is_set():
+                # Small results are read in full and kept for the next run
+                rows = []
+                try:
+                    with trace.stage("sql"):
+                        for chunk in iter(res.fetchmany, []):
+                            rows.extend(chunk)
+                            budget.add_rows(len(chunk))
+                except sqlite3.Error as e:
+                    res.close()
+                    return budget.message() or str(e), hdr, None, []
+                results.put_sql(db_path, run, version, hdr, rows)
+                return ListSource(hdr, rows), hdr, None, suggestions
+            # Large results stay in the cursor; the grid pulls pages as it
+            # scrolls, so from here on only the row budget applies
+            budget.stop()
+            query = (run, db_path) if is_read_only(run) else None
+            return CursorSource(res, total=total, query=query, budget=budget), hdr, res, suggestions
+
+        def done(result):
+            global current_data, current_stream
+            source, hdr, stream, suggestions = result
+            if isinstance(source, str):
+                fail_trace(trace, source)
+                messagebox.showerror("SQL Error", source)
+                return
+            if current_stream is not None:
+                current_stream.close()
+            current_stream = stream
+            total = source.total()
+            with trace.stage("render"):
+                display_results(source)
+                app.update_idletasks()
+            # Only results of read-only statements are exported (by running
+            # them again); anything else would be applied a second time
+            current_data = (hdr, None, (sql, db_path)) if is_read_only(sql) and hdr else None
+            trace.rows = total if total is not None else source.loaded()
+            if trace.sql != sql and trace.rows >= cost_guard.PREVIEW_ROWS:
+                # The guard's preview LIMIT cut the result; the real count
+                # would need the full scan it avoided
+                finish_trace(trace, f"Showing the first {trace.rows} results; there may be more.")
             else:
-                df_result = df
-            display_results(df_result)
-            current_data = (list(df_result.columns), df_result.values.tolist())
-            speak(f"I found {len(df_result)} result(s).")
-        except Exception as e:
+                finish_trace(trace, f"I found {trace.rows} result(s).")
+            if suggestions:
+                suggest_index(suggestions[0])
+
+        def failed(e):
+            fail_trace(trace, e)
+            messagebox.showerror("Error", f"Running query failed: {e}")
+
+        def discard(result):
+            # Cancelled after work returned: done never runs, so the open
+            # stream (and its pooled connection) is released here
+            stream = result[2]
+            if stream is not None:
+                stream.close()
+
+        start_task("Running query", traced_work(trace, work), done, failed, discard)
+    # Otherwise execute via pandas for CSV/Excel
+    elif df is not None:
+        frame, table, version = df, table_name, df_version
+        trace.source = "frame"
+
+        def done(df_result):
+            global current_data
+            with trace.stage("render"):
+                display_results(FrameSource(df_result))
+                app.update_idletasks()
+            # Keep the frame itself; exports stream it in slices
+            current_data = (list(df_result.columns), df_result, None)
+            trace.rows = len(df_result)
+            finish_trace(trace, f"I found {trace.rows} result(s).")
+
+        def failed(e):
+            fail_trace(trace, e)
             messagebox.showerror("Query failed", str(e))
-    # Otherwise use sqlite
-    elif hasattr(app, 'last_db_path'):
-        res, hdr = run_sql(sql, app.last_db_path)
-        if isinstance(res, str):
-            messagebox.showerror("SQL Error", res)
-            return
-        display_results(pd.DataFrame(res, columns=hdr))
-        current_data = (hdr, res)
-        speak(f"I found {len(res)} result(s).")
+
+        def work(cancel):
+            from frame_sql import run_frame_sql
+            cached = results.get(("frame", table), sql, version)
+            if cached is not None:
+                trace.source = "cache"
+                return cached
+            with trace.stage("frame_sql"):
+                result = run_frame_sql(frame, sql, table)
+            if len(result) <= results.max_rows:
+                results.put(("frame", table), sql, version, result, frame_size(result))
+            return result
+
+        start_task("Running query", traced_work(trace, work), done, failed)
     else:
         messagebox.showerror("Error", "No data source to run the query.")
 
-def display_results(df_out):
-    result_tree.delete(*result_tree.get_children())
-    result_tree["columns"] = list(df_out.columns)
-    result_tree["show"] = "headings"
-    for col in df_out.columns:
-        result_tree.heading(col, text=col)
-    for _, row in df_out.iterrows():
-        result_tree.insert("", tk.END, values=list(row))
+def suggest_index(suggestion):
+    global current_stream
+    if not messagebox.askyesno(
+            "Index suggestion",
+            f"Queries keep filtering or sorting on '{suggestion['column']}' with a full scan of "
+            f"'{suggestion['table']}'.\n\n{suggestion['ddl']}\n\nCreate this index now?"):
+        return
+    # An open read cursor would block the index build
+    if current_stream is not None:
+        current_stream.close()
+        current_stream = None
+
+    def done(report):
+        messagebox.showinfo(
+            "Index created",
+            f"{report['ddl']}\n\nQuery time: {report['before_ms']:.1f} ms before, "
+            f"{report['after_ms']:.1f} ms after.")
+
+    def work(cancel):
+        from index_advisor import advisor
+        return advisor.create(suggestion)
+
+    start_task("Creating index", work, done)
+
+def display_results(source):
+    # Only the visible window is turned into Treeview items
+    result_view.set_source(source)
+
+def update_row_count(top, shown, total):
+    # A streamed result that ran into the row budget while scrolling says so
+    stopped = getattr(result_view.source, "stopped", None)
+    note = f" · {stopped}" if stopped else ""
+    if not shown:
+        row_count_label.config(text="No rows" + note)
+        return
+    total_text = f"{total:,}" if total is not None else f"{top + shown:,}+"
+    row_count_label.config(text=f"Rows {top + 1:,}-{top + shown:,} of {total_text}{note}")
 
 def export_to_csv():
     global current_data
     if not current_data:
         messagebox.showwarning("Warning", "No data to export.")
         return
-    path = filedialog.asksaveasfilename(defaultextension=".csv")
-    if path:
-        hdr, rows = current_data
-        with open(path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(hdr)
-            writer.writerows(rows)
-        messagebox.showinfo("Exported", f"Exported to {path}")
+    path = filedialog.asksaveasfilename(
+        defaultextension=".csv",
+        filetypes=[("CSV File", "*.csv"), ("Gzip CSV", "*.csv.gz"), ("Parquet", "*.parquet")])
+    if not path:
+        return
+    hdr, frame, query = current_data
+    written = [0]
+
+    def progress(n):
+        written[0] = n
+
+    def work(cancel):
+        if frame is None:
+            # SQLite results are not held in memory; stream them again
+            return export.export_query(*query, path, progress=progress, cancel=cancel)
+        return export.export_frame(frame, path, progress=progress, cancel=cancel)
+
+    def show_progress():
+        if current_task is task:
+            status_bar.config(text=f"Exporting... {written[0]:,} rows written")
+            app.after(250, show_progress)
+
+    def done(result):
+        messagebox.showinfo("Exported", f"Exported {written[0]:,} rows to {path}")
+
+    def failed(e):
+        messagebox.showerror("Export failed", str(e))
+
+    task = start_task("Exporting", work, done, failed)
+    show_progress()
 
 def handle_generate_graph():
-    global df, columns
-    if df is None or len(columns) < 2:
+    import charts
+    if not current_data or len(current_data[0]) < 2:
         messagebox.showwarning("No Data", "Load data and run a query first.")
         return
+    # Charts are built from the current query result
+    hdr, frame, query = current_data
     # Ask user to select X and Y columns
     graph_win = tk.Toplevel(app)
     graph_win.title("Select Columns for Graph")
-    graph_win.geometry("350x240")
+    graph_win.geometry("350x300")
     graph_win.resizable(False, False)
     graph_win.config(bg="#f8f8f8")
 
     tk.Label(graph_win, text="Select X axis:", font=("Segoe UI", 12), bg="#f8f8f8").pack(pady=(20, 5))
-    x_var = tk.StringVar(value=columns[0])
-    x_menu = ttk.Combobox(graph_win, textvariable=x_var, values=columns, state="readonly")
+    x_var = tk.StringVar(value=hdr[0])
+    x_menu = ttk.Combobox(graph_win, textvariable=x_var, values=hdr, state="readonly")
     x_menu.pack(pady=5, fill="x", padx=30)
 
     tk.Label(graph_win, text="Select Y axis:", font=("Segoe UI", 12), bg="#f8f8f8").pack(pady=(10, 5))
-    y_var = tk.StringVar(value=columns[1])
-    y_menu = ttk.Combobox(graph_win, textvariable=y_var, values=columns, state="readonly")
+    y_var = tk.StringVar(value=hdr[1])
+    y_menu = ttk.Combobox(graph_win, textvariable=y_var, values=hdr, state="readonly")
     y_menu.pack(pady=5, fill="x", padx=30)
 
+    tk.Label(graph_win, text="Aggregate:", font=("Segoe UI", 12), bg="#f8f8f8").pack(pady=(10, 5))
+    agg_var = tk.StringVar(value="SUM")
+    agg_menu = ttk.Combobox(graph_win, textvariable=agg_var, values=charts.AGGREGATES, state="readonly")
+    agg_menu.pack(pady=5, fill="x", padx=30)
+
+    def draw(chart, x_col, y_col):
+        import matplotlib.pyplot as plt
+        plt.figure(figsize=(8, 5))
+        if chart["kind"] == "line":
+            plt.plot(chart["x"], chart["y"])
+        else:
+            plt.bar(chart["x"], chart["y"])
+            plt.xticks(rotation=45, ha="right")
+        plt.xlabel(x_col)
+        plt.ylabel(y_col)
+        plt.title(f"{y_col} by {x_col}")
+        plt.tight_layout()
+        plt.show()
+
     def plot_graph():
-        x_col = x_var.get()
-        y_col = y_var.get()
-        try:
-            df[y_col] = pd.to_numeric(df[y_col], errors='coerce')
-            if df[y_col].dropna().empty:
-                messagebox.showerror("Graph Error", f"No numeric data found in column '{y_col}'.")
-                return
-            plt.figure(figsize=(8, 5))
-            df.plot(kind='bar', x=x_col, y=y_col)
-            plt.title(f"{y_col} by {x_col}")
-            plt.tight_layout()
-            plt.show()
+        x_col, y_col, agg = x_var.get(), y_var.get(), agg_var.get()
+
+        # Grouping/downsampling runs in the background; only the plot is drawn here
+        def work(cancel):
+            if frame is None:
+                return charts.sql_chart_data(query[0], query[1], x_col, y_col, agg, cancel=cancel)
+            return charts.frame_chart_data(frame, x_col, y_col, agg)
+
+        def done(chart):
             graph_win.destroy()
-        except Exception as e:
+            draw(chart, x_col, y_col)
+
+        def failed(e):
             messagebox.showerror("Graph Error", f"Could not plot graph: {e}")
 
+        start_task("Preparing graph", work, done, failed)
+
     # Use a frame to center the button
     btn_frame = tk.Frame(graph_win, bg="#f8f8f8")
     btn_frame.pack(pady=18, fill="x")
@@ -268,6 +822,7 @@ app.title("🗃️ AskDB")
 app.geometry("1100x750")
 app.config(bg="#f8f8f8")
 dark_mode = False
+runner = BackgroundRunner(app)
 
 table_var = tk.StringVar()
 nl_var = tk.StringVar()
@@ -411,9 +966,12 @@ def style_button(btn, color):
 
 buttons = [
     ("📁 Choose File", handle_file_select, "#455a64"),
+    ("📂 Load Folder", handle_folder_select, "#546e7a"),
+    ("👁️ Watch File", toggle_watch, "#607d8b"),
     ("🎙️ Speak", handle_voice_query, "#43a047"),
     ("⚙️ Generate SQL", handle_generate_sql, "#0288d1"),
     ("▶️ Run SQL", handle_run_query, "#7b1fa2"),
+    ("⏹️ Cancel", handle_cancel, "#c0392b"),
     ("📤 Export CSV", export_to_csv, "#f57c00"),
     ("📊 Generate Graph", handle_generate_graph, "#00b894"),
     ("🌓 Dark Mode", toggle_dark_mode, "#263238"),
@@ -424,6 +982,8 @@ for txt, cmd, col in buttons:
     style_button(b, col)
     b.pack(side="left", padx=6)
     button_widgets.append((b, col))
+cancel_btn = button_widgets[6][0]
+cancel_btn.config(state="disabled")
 
 tk.Label(main_frame, text="Generated SQL Query:", font=("Segoe UI",14,"bold"), bg=app["bg"]).pack(anchor="w", pady=(10,2))
 tk.Entry(main_frame, textvariable=sql_var, width=85, font=("Segoe UI",11)).pack(ipady=4, pady=4)
@@ -437,10 +997,13 @@ result_tree = ttk.Treeview(result_frame)
 # Create vertical and horizontal scrollbars
 scroll_y = ttk.Scrollbar(result_frame, orient="vertical", command=result_tree.yview)
 scroll_x = ttk.Scrollbar(result_frame, orient="horizontal", command=result_tree.xview)
-result_tree.configure(yscroll=scroll_y.set, xscroll=scroll_x.set)
+result_tree.configure(xscroll=scroll_x.set)
+row_count_label = tk.Label(result_frame, text="", anchor="e", bg=app["bg"], font=("Segoe UI",9))
+row_count_label.pack(side="bottom", fill="x")
 scroll_y.pack(side="right", fill="y")
 scroll_x.pack(side="bottom", fill="x")
 result_tree.pack(side="left", fill="both", expand=True)
+result_view = VirtualResultView(result_tree, scroll_y, on_change=update_row_count)
 
 def set_treeview_style(dark):
     bg = "#263238" if dark else "#f8f8f8"
@@ -451,5 +1014,33 @@ set_treeview_style(False)
 
 status_bar = tk.Label(app, text="Ready", bd=1, relief="sunken", anchor="w", bg="#dfe6e9", font=("Segoe UI",9))
 status_bar.pack(side="bottom", fill="x")
+app.bind("<F9>", toggle_profile_next)
+
+def on_interactive():
+    global watch_job
+    startup.mark("interactive")
+    # TTS engine and heavy modules load in the background from here on
+    speaker.start()
+
+    def loaded(*args):
+        # pyplot itself is imported on the Tk thread
+        try:
+            import matplotlib.pyplot
+            startup.mark("loaded pyplot")
+        except ImportError:
+            pass
+        startup.report()
+
+    runner.submit("Preloading", lambda cancel: startup.preload(), on_done=loaded, on_error=loaded)
+    if watching:
+        watch_job = app.after(WATCH_POLL_MS, poll_watched)
+
+def run(username=None):
+    if username:
+        do_login(username)
+    startup.mark("window built")
+    app.after_idle(on_interactive)
+    app.mainloop()
 
-app.mainloop()
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,103 @@
+import re
+import threading
+import time
+
+from db import pool, quote_ident
+from frame_sql import Unsupported, parse
+
+USAGE_THRESHOLD = 3
+# Only these predicates can be served by a plain b-tree index
+INDEXABLE_OPS = {"=", "==", "<", ">", "<=", ">=", "between"}
+
+
+# ----------------- Index Advisor -------------------
+# Counts how often generated queries filter or sort on each column. Once a
+# column crosses the threshold and EXPLAIN QUERY PLAN still shows a full scan
+# (or a temp b-tree for ORDER BY), the advisor suggests an index; create()
+# builds it and reports the query latency before and after.
+class IndexAdvisor:
+    def __init__(self, threshold=USAGE_THRESHOLD):
+        self.threshold = threshold
+        self.usage = {}
+        self.suggested = set()
+        self.reports = []
+        self._lock = threading.Lock()
+
+    def record(self, db_path, sql):
+        try:
+            query = parse(sql)
+        except Unsupported:
+            return []
+        table = query["table"]
+        used = [col for col, op, _ in query["where"] if op in INDEXABLE_OPS]
+        if query["order"]:
+            used.append(query["order"])
+        ready = []
+        with self._lock:
+            for col in dict.fromkeys(c.lower() for c in used):
+                key = (db_path, table, col)
+                self.usage[key] = self.usage.get(key, 0) + 1
+                if self.usage[key] >= self.threshold and key not in self.suggested:
+                    ready.append(col)
+        suggestions = []
+        for col in ready:
+            suggestion = self._check(db_path, table, col, sql)
+            with self._lock:
+                self.suggested.add((db_path, table, col))
+            if suggestion:
+                suggestions.append(suggestion)
+        return suggestions
+
+    def _check(self, db_path, table, col, sql):
+        with pool.connection(db_path) as conn:
+            if self._indexed(conn, table, col):
+                return None
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        scan = re.compile(rf"^SCAN (TABLE )?{re.escape(table)}\b", re.I)
+        full_scan = any(scan.match(d) and "INDEX" not in d for d in plan)
+        temp_sort = any("TEMP B-TREE FOR ORDER BY" in d for d in plan)
+        if not (full_scan or temp_sort):
+            return None
+        name = re.sub(r"\W+", "_", f"idx_{table}_{col}")
+        return {
+            "db_path": db_path,
+            "table": table,
+            "column": col,
+            "sql": sql,
+            "plan": plan,
+            "ddl": f"CREATE INDEX IF NOT EXISTS {quote_ident(name)} ON {quote_ident(table)}({quote_ident(col)})",
+        }
+
+    @staticmethod
+    def _indexed(conn, table, col):
+        for index in conn.execute(f"PRAGMA index_list({quote_ident(table)})").fetchall():
+            info = conn.execute(f"PRAGMA index_info({quote_ident(index[1])})").fetchall()
+            if info and info[0][2] is not None and info[0][2].lower() == col.lower():
+                return True
+        return False
+
+    def create(self, suggestion):
+        db_path, sql = suggestion["db_path"], suggestion["sql"]
+        before = time_query(db_path, sql)
+        with pool.connection(db_path, readonly=False) as conn:
+            conn.execute(suggestion["ddl"])
+            conn.commit()
+            conn.execute(f"ANALYZE {quote_ident(suggestion['table'])}")
+            conn.commit()
+        after = time_query(db_path, sql)
+        report = dict(suggestion, before_ms=before, after_ms=after)
+        with self._lock:
+            self.reports.append(report)
+        return report
+
+
+def time_query(db_path, sql):
+    with pool.connection(db_path) as conn:
+        start = time.perf_counter()
+        cursor = conn.execute(sql)
+        while cursor.fetchmany(1000):
+            pass
+        return (time.perf_counter() - start) * 1000
+
+
+advisor = IndexAdvisor()
@@ -0,0 +1,325 @@
+import csv
+import os
+import re
+import sqlite3
+
+from db import quote_ident
+
+WORKSPACE_DB = "workspace.db"
+CHUNK_ROWS = 100000
+SAMPLE_ROWS = 1000
+# CSVs above this size are ingested into SQLite instead of held in pandas
+LARGE_FILE_BYTES = 200 * 1024 * 1024
+
+# Only applied while a load is running
+LOAD_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "OFF",
+    "cache_size": -262144,
+    "temp_store": "MEMORY",
+}
+
+
+def table_name_for(file_path):
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    name = re.sub(r"\W+", "_", name).strip("_") or "data"
+    return "t_" + name if name[0].isdigit() else name
+
+
+def clean_headers(header):
+    names, seen = [], {}
+    for i, h in enumerate(header):
+        name = str(h).strip() if h is not None else ""
+        name = name or f"column{i + 1}"
+        if name.lower() in seen:
+            seen[name.lower()] += 1
+            name = f"{name}_{seen[name.lower()]}"
+        seen.setdefault(name.lower(), 0)
+        names.append(name)
+    return names
+
+
+# ----------------- Type Inference -------------------
+def _value_type(value):
+    if isinstance(value, bool) or isinstance(value, int):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    text = str(value).strip()
+    try:
+        int(text)
+        return "INTEGER"
+    except ValueError:
+        pass
+    try:
+        float(text)
+        return "REAL"
+    except ValueError:
+        return "TEXT"
+
+
+def infer_types(rows, width):
+    # INTEGER < REAL < TEXT; empty cells do not vote
+    order = {"INTEGER": 0, "REAL": 1, "TEXT": 2}
+    types = [None] * width
+    for row in rows:
+        for i in range(width):
+            value = row[i] if i < len(row) else None
+            if value is None or value == "" or types[i] == "TEXT":
+                continue
+            t = _value_type(value)
+            if types[i] is None or order[t] > order[types[i]]:
+                types[i] = t
+    return [t or "TEXT" for t in types]
+
+
+# ----------------- Row Readers -------------------
+def _csv_rows(file_path):
+    with open(file_path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        yield from csv.reader(f)
+
+
+def _xlsx_rows(file_path):
+    import openpyxl
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def _xls_rows(file_path):
+    import pandas as pd
+    frame = pd.read_excel(file_path, header=None, dtype=object)
+    for row in frame.itertuples(index=False, name=None):
+        yield tuple(None if v != v else v for v in row)
+
+
+def read_rows(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".csv":
+        return _csv_rows(file_path)
+    if ext == ".xlsx":
+        return _xlsx_rows(file_path)
+    if ext == ".xls":
+        return _xls_rows(file_path)
+    raise ValueError(f"Unsupported file format: {ext}")
+
+
+def _normalize(row, width):
+    # Empty cells become NULL; sqlite's column affinity converts numeric text
+    values = [None if v == "" else v for v in row[:width]]
+    values = [v if v is None or isinstance(v, (int, float, str, bytes)) else str(v) for v in values]
+    if len(values) < width:
+        values.extend([None] * (width - len(values)))
+    return values
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ----------------- Loader -------------------
+def _create_table(conn, table, columns, types, if_exists):
+    with conn:
+        if if_exists == "replace":
+            conn.execute(f"DROP TABLE IF EXISTS {quote_ident(table)}")
+        cols = ", ".join(f"{quote_ident(c)} {t}" for c, t in zip(columns, types))
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {quote_ident(table)} ({cols})")
+
+
+def load_rows_to_sqlite(rows, table, db_path=WORKSPACE_DB, chunk_rows=CHUNK_ROWS,
+                        if_exists="replace", progress=None, cancel=None):
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("File is empty")
+    columns = clean_headers(header)
+    width = len(columns)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        for name, value in LOAD_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        insert = (f"INSERT INTO {quote_ident(table)} VALUES "
+                  f"({', '.join('?' * width)})")
+        loaded = 0
+        created = False
+        for chunk in _chunks(rows, chunk_rows):
+            if cancel is not None and cancel.is_set():
+                break
+            chunk = [_normalize(row, width) for row in chunk if row]
+            if not created:
+                # Column types come from the first chunk
+                _create_table(conn, table, columns, infer_types(chunk[:SAMPLE_ROWS], width), if_exists)
+                created = True
+            with conn:
+                conn.executemany(insert, chunk)
+            loaded += len(chunk)
+            if progress:
+                progress(loaded)
+        if not created and not (cancel is not None and cancel.is_set()):
+            _create_table(conn, table, columns, ["TEXT"] * width, if_exists)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+    return table
+
+
+def append_rows_to_sqlite(rows, table, db_path=WORKSPACE_DB, chunk_rows=CHUNK_ROWS):
+    # Rows without a header, into an existing table; returns the rows added
+    conn = sqlite3.connect(db_path)
+    try:
+        width = len(conn.execute(f"PRAGMA table_info({quote_ident(table)})").fetchall())
+        if not width:
+            raise ValueError(f"No such table: {table}")
+        insert = f"INSERT INTO {quote_ident(table)} VALUES ({', '.join('?' * width)})"
+        added = 0
+        for chunk in _chunks(rows, chunk_rows):
+            chunk = [_normalize(row, width) for row in chunk if row]
+            with conn:
+                conn.executemany(insert, chunk)
+            added += len(chunk)
+    finally:
+        conn.close()
+    return added
+
+
+def load_file_to_sqlite(file_path, db_path=WORKSPACE_DB, table=None, rows=None, **kwargs):
+    # rows replaces reading the whole file, e.g. with a CsvTail's prefix
+    table = table or table_name_for(file_path)
+    rows = read_rows(file_path) if rows is None else rows
+    return load_rows_to_sqlite(rows, table, db_path=db_path, **kwargs)
+
+
+# ----------------- Folder Ingestion -------------------
+# Each file is parsed in a worker process into its own scratch database, so
+# parsing scales with cores and no rows cross process boundaries. The thread
+# that calls load_folder is the only writer to the workspace and copies each
+# scratch table in with INSERT ... SELECT as soon as it is ready.
+FOLDER_EXTENSIONS = (".csv", ".xlsx", ".xls")
+_DATE_SUFFIX_RE = re.compile(r"[\W_]*\d[\d\W_]*$")
+
+
+def folder_files(folder):
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                  if name.lower().endswith(FOLDER_EXTENSIONS) and not name.startswith(("~$", ".")))
+
+
+def _parse_file(file_path, scratch_db):
+    # Runs in a worker process
+    load_rows_to_sqlite(read_rows(file_path), "data", scratch_db)
+    conn = sqlite3.connect(scratch_db)
+    try:
+        info = conn.execute("PRAGMA table_info(data)").fetchall()
+    finally:
+        conn.close()
+    return file_path, [row[1] for row in info], [row[2] for row in info]
+
+
+def _group_table(file_path, columns, groups, taken, append):
+    # Daily exports like sales_2024-01-02.csv share the table "sales" when
+    # their headers match; otherwise every file gets its own table.
+    stem = table_name_for(file_path)
+    base = (_DATE_SUFFIX_RE.sub("", stem) or stem) if append else stem
+    key = (base, tuple(c.lower() for c in columns)) if append else file_path
+    if key not in groups:
+        name, n = base, 1
+        while name.lower() in taken:
+            n += 1
+            name = f"{base}_{n}"
+        taken.add(name.lower())
+        groups[key] = name
+        return name, True
+    return groups[key], False
+
+
+def load_folder(folder, db_path=WORKSPACE_DB, append=True, workers=None, on_table=None, cancel=None):
+    # on_table(table, file_path, rows) is called after each file is committed.
+    # Returns {table: [file paths]}; files that fail to parse are listed under None.
+    import shutil
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    files = folder_files(folder)
+    if not files:
+        raise ValueError("No CSV or Excel files in this folder.")
+    loaded, groups, taken = {}, {}, set()
+    scratch = tempfile.mkdtemp(prefix="askdb-ingest-", dir=os.path.dirname(os.path.abspath(db_path)))
+    conn = sqlite3.connect(db_path)
+    executor = ProcessPoolExecutor(max_workers=workers or min(len(files), os.cpu_count() or 1))
+    try:
+        for name, value in LOAD_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        futures = {executor.submit(_parse_file, path, os.path.join(scratch, f"{i}.db")): path
+                   for i, path in enumerate(files)}
+        for future in as_completed(futures):
+            if cancel is not None and cancel.is_set():
+                break
+            try:
+                file_path, columns, types = future.result()
+            except Exception:
+                loaded.setdefault(None, []).append(futures[future])
+                continue
+            scratch_db = os.path.join(scratch, f"{files.index(file_path)}.db")
+            table, new = _group_table(file_path, columns, groups, taken, append)
+            if new:
+                _create_table(conn, table, columns, types, "replace")
+            conn.execute("ATTACH DATABASE ? AS scratch", (scratch_db,))
+            try:
+                with conn:
+                    rows = conn.execute(
+                        f"INSERT INTO main.{quote_ident(table)} SELECT * FROM scratch.data").rowcount
+            finally:
+                conn.execute("DETACH DATABASE scratch")
+            os.remove(scratch_db)
+            loaded.setdefault(table, []).append(file_path)
+            if on_table:
+                on_table(table, file_path, rows)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA optimize")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        conn.close()
+        shutil.rmtree(scratch, ignore_errors=True)
+    return loaded
+
+
+def _stop(signum, frame):
+    # SIGTERM (Cancel in the GUI) unwinds like an exception, so load_folder
+    # still shuts its pool down and removes its scratch directory
+    raise SystemExit(128 + signum)
+
+
+def main(argv=None):
+    # Prints one JSON line per committed file, then {"failed": [...]}
+    import argparse
+    import json
+    import signal
+    parser = argparse.ArgumentParser(description="Load a folder of CSV/Excel files into SQLite")
+    parser.add_argument("folder")
+    parser.add_argument("--db", default=WORKSPACE_DB)
+    parser.add_argument("--separate", action="store_true", help="one table per file, even when headers match")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args(argv)
+    signal.signal(signal.SIGTERM, _stop)
+
+    def report(table, file_path, rows):
+        print(json.dumps({"table": table, "file": file_path, "rows": rows}), flush=True)
+
+    result = load_folder(args.folder, args.db, append=not args.separate, workers=args.workers,
+                         on_table=report)
+    print(json.dumps({"failed": result.get(None, [])}), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
+import startup
 import customtkinter as ctk
 from tkinter import messagebox
 import sqlite3
 import subprocess
 import sys
-import os
 
 ctk.set_appearance_mode("light")
 ctk.set_default_color_theme("blue")
@@ -11,6 +11,7 @@ ctk.set_default_color_theme("blue")
 app = ctk.CTk()
 app.geometry("450x420")
 app.title("🔐 VoiceSQL Login")
+logged_in_user = [None]
 
 def login():
     user = username.get()
@@ -24,10 +25,8 @@ def login():
 
     if result:
         messagebox.showinfo("Success", f"Welcome {user}!")
+        logged_in_user[0] = user
         app.destroy()
-
-        # Launch VoiceSQL GUI
-        subprocess.run([sys.executable, "gui.py"])
     else:
         messagebox.showerror("Failed", "Invalid username or password")
 
@@ -47,4 +46,11 @@ password.pack(pady=10)
 ctk.CTkButton(app, text="🔓 Login", command=login, width=200).pack(pady=15)
 ctk.CTkButton(app, text="📝 Sign Up", command=open_signup, width=200, fg_color="#777").pack()
 
+startup.mark("login window")
 app.mainloop()
+
+# Launch VoiceSQL GUI in this process once the login window is gone
+if logged_in_user[0]:
+    startup.mark("logged in")
+    import gui
+    gui.run(logged_in_user[0])
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+import nl2sql
+from cost_guard import GUARD_MODES, Budget, guard
+
+DEFAULT_WORKERS = 4
+DEFAULT_TIMEOUT = 60.0
+# Lines starting with one of these are run as SQL instead of being translated
+SQL_PREFIXES = ("select", "with", "insert", "update", "delete", "replace", "create", "drop", "alter",
+                "pragma", "attach", "vacuum")
+
+
+# ----------------- Batch Runner -------------------
+def read_questions(path):
+    # One question (or SQL statement) per line; blank lines and # comments are skipped
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def open_source(path, workspace=nl2sql.loader.WORKSPACE_DB):
+    # SQLite files are used in place; CSV/Excel files are ingested first
+    if os.path.splitext(path)[1].lower() in (".db", ".sqlite"):
+        tables = db.get_tables(path)
+        if not tables:
+            raise ValueError("No tables found in database.")
+        return path, tables[0]
+    table = nl2sql.load_file_to_sqlite(path, db_path=workspace)
+    return workspace, table
+
+
+def make_translator(db_path, table):
+    columns = db.get_columns(db_path, table)
+    translator = nl2sql.get_translator(table, [c.lower() for c in columns])
+    translator.use_values(nl2sql.build_value_index_sqlite(nl2sql.ValueIndex(), db_path, table))
+    return translator
+
+
+def translate(translator, index, question):
+    start = time.perf_counter()
+    first = question.split(None, 1)[0].lower()
+    if first in SQL_PREFIXES:
+        sql = question
+    else:
+        sql = translator.generate_sql(question)
+    return {"index": index, "question": question, "sql": sql,
+            "translate_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+
+def execute(record, db_path, timeout=DEFAULT_TIMEOUT, keep_rows=0, max_rows=0, guard_mode="warn"):
+    sql = record["sql"]
+    if not db.is_read_only(sql):
+        return dict(record, error="only read-only statements are run in batch mode")
+    sql, warning = guard(sql, db_path, guard_mode)
+    if warning:
+        record = dict(record, sql=sql, warning=warning)
+    start = time.perf_counter()
+    # The progress handler stops the statement at the time or row budget
+    budget = Budget(timeout, max_rows)
+
+    def failed(error):
+        return dict(record, error=budget.message() or error,
+                    execute_ms=round((time.perf_counter() - start) * 1000, 3))
+
+    stream, headers = db.run_sql(sql, db_path, cancel=budget)
+    if isinstance(stream, str):
+        return failed(stream)
+    rows, sample = 0, []
+    try:
+        with stream:
+            while True:
+                chunk = stream.fetchmany()
+                if not chunk:
+                    break
+                if len(sample) < keep_rows:
+                    sample.extend(chunk[:keep_rows - len(sample)])
+                rows += len(chunk)
+                budget.add_rows(len(chunk))
+    except db.sqlite3.Error as e:
+        return failed(str(e))
+    result = dict(record, columns=headers, rows=rows,
+                  execute_ms=round((time.perf_counter() - start) * 1000, 3))
+    if keep_rows:
+        result["sample"] = [list(r) for r in sample]
+    return result
+
+
+def run_batch(source, questions, out, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, keep_rows=0,
+              table=None, workspace=nl2sql.loader.WORKSPACE_DB, max_rows=0, guard_mode="warn"):
+    # Writes one JSON line per question, in input order, as results come in
+    db_path, default_table = open_source(source, workspace)
+    translator = make_translator(db_path, table or default_table)
+    db.pool.max_idle = max(db.pool.max_idle, workers)
+    records = [translate(translator, i, q) for i, q in enumerate(questions)]
+
+    summary = {"questions": len(records), "errors": 0, "warnings": 0, "rows": 0}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # sqlite3 releases the GIL while a statement runs, so threads overlap
+        for result in executor.map(lambda r: execute(r, db_path, timeout, keep_rows, max_rows, guard_mode), records):
+            out.write(json.dumps(result, default=str) + "\n")
+            out.flush()
+            summary["errors"] += "error" in result
+            summary["warnings"] += "warning" in result
+            summary["rows"] += result.get("rows", 0)
+    summary["elapsed_s"] = round(time.perf_counter() - start, 3)
+    summary["translator_cache"] = translator.cache_info()
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a file of questions against a database and emit JSONL")
+    parser.add_argument("source", help="SQLite database, or a CSV/Excel file to ingest")
+    parser.add_argument("questions", help="text file with one question or SQL statement per line, or -")
+    parser.add_argument("--table", help="table to query (default: the first one)")
+    parser.add_argument("--output", "-o", help="JSONL output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds per query, 0 for none")
+    parser.add_argument("--max-rows", type=int, default=0, help="row budget per query, 0 for none")
+    parser.add_argument("--guard", choices=GUARD_MODES, default="warn",
+                        help="full scans of large tables: run as is (off), report them (warn) or cap them (limit)")
+    parser.add_argument("--rows", type=int, default=0, help="include up to this many result rows per query")
+    parser.add_argument("--workspace", default=nl2sql.loader.WORKSPACE_DB,
+                        help="database that CSV/Excel sources are loaded into")
+    args = parser.parse_args(argv)
+
+    questions = read_questions(args.questions)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        summary = run_batch(args.source, questions, out, args.workers, args.timeout, args.rows,
+                            args.table, args.workspace, args.max_rows, args.guard)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(summary), file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,128 +1,621 @@
 import sqlite3
 import difflib
+import hashlib
 import re
+import os
+import bisect
+import threading
+from collections import OrderedDict
+
+import db
+import loader
+
+# Synonym table used to resolve query terms to columns. Each key lists the
+# phrases that refer to it; the phrases are also matched (spaces removed)
+# against column names with underscores removed.
+CRICKET_TERMS = {
+    "batting": ["batting_hand", "batting style", "batting"],
+    "bowling": ["bowling_skill", "bowling", "bowling style"],
+    "City": ["City", "nation"],
+    "player": ["playername", "name", "player name"],
+    "runs": ["runs", "score"],
+    "wickets": ["wickets"],
+    # Match database terms:
+    "city": ["city", "venue", "location"],
+    "date": ["date", "match date"],
+    "season": ["season", "year"],
+    "team1": ["team1", "first team", "home team"],
+    "team2": ["team2", "second team", "away team"],
+    "winner": ["winner", "winning team"],
+    "toss": ["toss_winner", "toss", "toss winner"],
+    "umpire": ["umpire1", "umpire2", "umpire"],
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+_WORD_CACHE_LIMIT = 4096
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _tokenize(text):
+    return tuple(_TOKEN_RE.findall(str(text).lower()))
+
+
+def _sql_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _is_simple_value(val):
+    return bool(val) and (val.isdigit() or val.replace('.', '', 1).isdigit() or val.isalpha())
+
+
+# ----------------- Intent classifier -------------------
+# One lexer pass splits the query into quoted literals and words; one
+# classifier pass over those tokens fills in an Intent.
+_LEX_RE = re.compile(r"'(?P<quoted>[^']+)'|(?P<word>[A-Za-z0-9_]+)")
+_VALUE_RE = re.compile(r"\s+([a-z0-9\s\+\-]+)")
+
+_GT_WORDS = {"above", "over"}
+_LT_WORDS = {"below", "under"}
+_TOP_WORDS = {"top", "first"}
+_EXTREMES = {"maximum": "MAX", "highest": "MAX", "max": "MAX",
+             "minimum": "MIN", "lowest": "MIN", "min": "MIN"}
+_LIKE_WORDS = {"contains", "like"}
+_EQUALS_WORDS = {"equals", "is", "with", "held", "having", "from"}
+_VALUE_WORDS = {"from", "with", "is", "equals", "containing", "named", "having", "of", "by"}
+
+
+class Intent:
+    __slots__ = ("tokens", "quoted", "value_starts", "gt", "lt", "between",
+                 "aggregate", "extreme", "top", "like", "equals")
+
+    def __init__(self):
+        self.tokens = []          # lower-cased words outside quotes
+        self.quoted = None        # first 'quoted' literal
+        self.value_starts = []    # offsets just after value keywords
+        self.gt = None
+        self.lt = None
+        self.between = None
+        self.aggregate = None     # COUNT or SUM
+        self.extreme = None       # MAX or MIN
+        self.top = None
+        self.like = False
+        self.equals = False
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__[1:]
+                           if getattr(self, name) not in (None, False, []))
+        return f"Intent({fields})"
+
+
+def parse_intent(query):
+    intent = Intent()
+    words = []  # (word, end offset)
+    for m in _LEX_RE.finditer(query):
+        if m.lastgroup == "quoted":
+            if intent.quoted is None:
+                intent.quoted = m.group("quoted")
+        else:
+            words.append((m.group("word").lower(), m.end()))
+    intent.tokens = [w for w, _ in words]
+
+    def word_at(i):
+        return words[i][0] if i < len(words) else ""
+
+    def number_at(i):
+        w = word_at(i)
+        return w if w.isdigit() else None
+
+    for i, (w, end) in enumerate(words):
+        nxt = word_at(i + 1)
+        if w in _VALUE_WORDS:
+            intent.value_starts.append(end)
+        elif w == "named" and nxt == "as":
+            intent.value_starts.append(words[i + 1][1])
+
+        if intent.gt is None:
+            if w in _GT_WORDS:
+                intent.gt = number_at(i + 1)
+            elif w in ("more", "greater") and nxt == "than":
+                intent.gt = number_at(i + 2)
+        if intent.lt is None:
+            if w in _LT_WORDS:
+                intent.lt = number_at(i + 1)
+            elif w == "less" and nxt == "than":
+                intent.lt = number_at(i + 2)
+        if intent.between is None and w == "between" and word_at(i + 2) == "and":
+            lo, hi = number_at(i + 1), number_at(i + 3)
+            if lo is not None and hi is not None:
+                intent.between = (lo, hi)
+        if intent.top is None and w in _TOP_WORDS:
+            intent.top = number_at(i + 1)
+
+        if w == "count" or (w == "how" and nxt == "many"):
+            intent.aggregate = "COUNT"
+        elif w == "sum" and intent.aggregate is None:
+            intent.aggregate = "SUM"
+        elif w in _EXTREMES and intent.extreme != "MAX":
+            intent.extreme = _EXTREMES[w]
+        elif w in _LIKE_WORDS:
+            intent.like = True
+        if w in _EQUALS_WORDS:
+            intent.equals = True
+    return intent
+
+
+def normalize_query(query):
+    # Collapse whitespace and trailing punctuation so near-identical
+    # questions share a cache entry; case is kept since values use it.
+    return _SPACE_RE.sub(" ", query).strip().rstrip("?.!").strip()
+
+
+def schema_fingerprint(columns):
+    return hashlib.sha1("\x1f".join(map(str, columns)).encode("utf-8")).hexdigest()
+
+
+# ----------------- Value dictionary -------------------
+# Distinct values of low-cardinality text columns, indexed by word, word
+# prefix and word trigram, so a literal in a question ("Mumbai", "kohli")
+# can be traced back to the column that holds it. Columns are added one at a
+# time from a background task; `version` moves with every addition.
+MAX_DISTINCT_VALUES = 1000
+VALUE_SAMPLE_ROWS = 200000
+MAX_VALUE_NGRAM = 3
+FUZZY_CUTOFF = 0.8
+_VALUE_WORD_RE = re.compile(r"[A-Za-z0-9_+\-]+")
+_QUOTED_VALUE_RE = re.compile(r"'([^']+)'")
+_VALUE_STOPWORDS = {
+    "a", "all", "an", "and", "as", "at", "average", "by", "display", "find", "for", "get",
+    "give", "how", "in", "list", "many", "match", "matches", "me", "number", "on", "or",
+    "played", "record", "records", "row", "rows", "show", "than", "the", "to", "total",
+    "was", "were", "what", "where", "which", "who", "won",
+} | _GT_WORDS | _LT_WORDS | _TOP_WORDS | set(_EXTREMES) | _LIKE_WORDS | _EQUALS_WORDS | _VALUE_WORDS
+
+
+def _trigrams(word):
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ValueIndex:
+    def __init__(self, max_distinct=MAX_DISTINCT_VALUES):
+        self.max_distinct = max_distinct
+        self.version = 0
+        self.started = False
+        self.columns = []
+        self._values = {}      # lower-cased value -> [(column, value)]
+        self._words = {}       # word -> [(column, value)]
+        self._trigrams = {}    # trigram -> {word}
+        self._sorted_words = []
+        self._lock = threading.Lock()
+
+    def add_column(self, column, values):
+        values = {str(v).strip() for v in values if v is not None and str(v).strip()}
+        if not values or len(values) > self.max_distinct:
+            return False
+        with self._lock:
+            for value in sorted(values):
+                entry = (str(column).lower(), value)
+                self._values.setdefault(value.lower(), []).append(entry)
+                for word in _tokenize(value):
+                    if word.isdigit():
+                        continue
+                    if word not in self._words:
+                        self._words[word] = []
+                        for gram in _trigrams(word):
+                            self._trigrams.setdefault(gram, set()).add(word)
+                    self._words[word].append(entry)
+            self._sorted_words = sorted(self._words)
+            self.columns.append(str(column).lower())
+            self.version += 1
+        return True
+
+    def _word_hits(self, word):
+        # (score, hits) for one query word: exact word, then prefix, then fuzzy
+        hits = self._words.get(word)
+        if hits:
+            return 2.0, hits
+        if len(word) < 4:
+            return 0.0, []
+        i = bisect.bisect_left(self._sorted_words, word)
+        if i < len(self._sorted_words) and self._sorted_words[i].startswith(word):
+            return 1.5, self._words[self._sorted_words[i]]
+        counts = {}
+        for gram in _trigrams(word):
+            for candidate in self._trigrams.get(gram, ()):
+                counts[candidate] = counts.get(candidate, 0) + 1
+        candidates = sorted(counts, key=counts.get, reverse=True)[:20]
+        close = difflib.get_close_matches(word, candidates, n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            return 1.0, self._words[close[0]]
+        return 0.0, []
+
+    def match(self, query, columns=None, prefer=None, skip=()):
+        # Best (column, value, text as typed) for a literal in the query, or
+        # None. Whole values beat single words; ties go to `prefer`, then to
+        # the earlier column in `columns`.
+        allowed = [c.lower() for c in columns] if columns else None
+        words = [(m.group(0), m.group(0).lower()) for m in _VALUE_WORD_RE.finditer(query)]
+        quoted = _QUOTED_VALUE_RE.findall(query)
+        best = None
+        with self._lock:
+            candidates = [(4.0, q, self._values.get(q.lower(), [])) for q in quoted]
+            for size in range(min(MAX_VALUE_NGRAM, len(words)), 0, -1):
+                for start in range(len(words) - size + 1):
+                    gram = words[start:start + size]
+                    lowered = [w for _, w in gram]
+                    if all(w in _VALUE_STOPWORDS or w in skip or w.isdigit() for w in lowered):
+                        continue
+                    text = " ".join(w for w, _ in gram)
+                    hits = self._values.get(" ".join(lowered))
+                    if hits:
+                        candidates.append((3.0 + size, text, hits))
+                    elif size == 1:
+                        score, hits = self._word_hits(lowered[0])
+                        if hits:
+                            candidates.append((score, text, hits))
+            for score, text, hits in candidates:
+                for column, value in hits:
+                    if allowed is not None and column not in allowed:
+                        continue
+                    rank = (score, column == prefer,
+                            -(allowed.index(column) if allowed else 0), -len(value))
+                    if best is None or rank > best[0]:
+                        best = (rank, (column, value, text))
+        return best[1] if best else None
+
+
+def build_value_index_sqlite(index, db_path, table, cancel=None):
+    # Adds one TEXT column at a time from a sample of the table
+    for column, decl in db.schema.table_info(db_path, table):
+        if cancel is not None and cancel.is_set():
+            break
+        if decl and "CHAR" not in decl.upper() and "TEXT" not in decl.upper() and "CLOB" not in decl.upper():
+            continue
+        col = db.quote_ident(column)
+        with db.pool.connection(db_path) as conn:
+            db.watch_cancel(conn, cancel)
+            try:
+                rows = conn.execute(
+                    f"SELECT DISTINCT {col} FROM (SELECT {col} FROM {db.quote_ident(table)} "
+                    f"LIMIT {VALUE_SAMPLE_ROWS}) WHERE typeof({col}) = 'text' "
+                    f"LIMIT {index.max_distinct + 1}").fetchall()
+            except sqlite3.Error:
+                continue
+        index.add_column(column, [row[0] for row in rows])
+    return index
+
+
+def build_value_index_frame(index, frame, cancel=None):
+    for column in frame.columns:
+        if cancel is not None and cancel.is_set():
+            break
+        series = frame[column]
+        if series.dtype.kind not in "OSU" and str(series.dtype) not in ("category", "string", "str"):
+            continue
+        values = series.iloc[:VALUE_SAMPLE_ROWS].dropna().unique()
+        if len(values) <= index.max_distinct:
+            index.add_column(column, [v for v in values if isinstance(v, str)])
+    return index
+
+
+MAX_VALUE_INDEXES = 16
+value_indexes = OrderedDict()
+_value_indexes_lock = threading.Lock()
+
+
+def get_value_index(source, table):
+    # One index per (database path or loaded frame, table); the caller fills
+    # it with build_value_index_sqlite/build_value_index_frame
+    key = (source, table)
+    with _value_indexes_lock:
+        index = value_indexes.get(key)
+        if index is None:
+            index = value_indexes[key] = ValueIndex()
+            if len(value_indexes) > MAX_VALUE_INDEXES:
+                value_indexes.popitem(last=False)
+        value_indexes.move_to_end(key)
+        return index
+
+
+def drop_value_indexes(source, table=None):
+    # Every table's index for source, or just table's
+    with _value_indexes_lock:
+        for key in [k for k in value_indexes if k[0] == source and table in (None, k[1])]:
+            del value_indexes[key]
+
 
 class NL2SQL:
-    def __init__(self, table_name, columns):
+    def __init__(self, table_name, columns, synonyms=None, cache_size=512):
         self.table_name = table_name
         self.columns = columns
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._sql_cache = OrderedDict()
+        # Shared by server and batch worker threads; guards the SQL cache
+        # and its counters
+        self._lock = threading.Lock()
+        self.values = None
+        self._values_version = None
+        self.synonyms = {k: list(v) for k, v in CRICKET_TERMS.items()}
+        for key, names in (synonyms or {}).items():
+            self.synonyms.setdefault(key, []).extend(names)
+        self._build_index()
 
-    def _match_col(self, query):
-        query_lc = query.lower()
-        # Try exact match
-        for col in self.columns:
-            if col.lower() in query_lc:
-                return col
-        # Fuzzy/partial match for cricket/match terms
-        cricket_terms = {
-            "batting": ["batting_hand", "batting style", "batting"],
-            "bowling": ["bowling_skill", "bowling", "bowling style"],
-            "City": ["City", "nation"],
-            "player": ["playername", "name", "player name"],
-            "runs": ["runs", "score"],
-            "wickets": ["wickets"],
-            # Match database terms:
-            "city": ["city", "venue", "location"],
-            "date": ["date", "match date"],
-            "season": ["season", "year"],
-            "team1": ["team1", "first team", "home team"],
-            "team2": ["team2", "second team", "away team"],
-            "winner": ["winner", "winning team"],
-            "toss": ["toss_winner", "toss", "toss winner"],
-            "umpire": ["umpire1", "umpire2", "umpire"],
-        }
-        for key, colnames in cricket_terms.items():
-            for cname in colnames:
-                if key in query_lc or cname in query_lc:
-                    for col in self.columns:
-                        if cname.replace(" ", "").lower() in col.replace("_", "").lower():
-                            return col
-        # Fallback: partial word match
-        for col in self.columns:
-            for word in query_lc.split():
-                if word in col.lower():
-                    return col
-        return self.columns[0] if self.columns else "*"
-
-    def _extract_value(self, query):
+    # ----------------- Column index -------------------
+    def _build_index(self):
+        # phrase (token tuple) -> (rank, column); lower rank wins
+        self._phrases = {}
+        self._col_lc = [str(col).lower() for col in self.columns]
+        self._col_flat = [c.replace("_", "") for c in self._col_lc]
+        self._word_cache = {}
+
+        # Tier 0: column names mentioned directly
+        for i, col in enumerate(self.columns):
+            self._add_phrase(_tokenize(self._col_lc[i]), (0, i), col)
+            self._add_phrase(_tokenize(self._col_lc[i].replace("_", " ")), (0, i), col)
+
+        # Tier 1: synonyms. The key itself tries every phrase in order, a
+        # phrase on its own only resolves through itself.
+        for k, (key, names) in enumerate(self.synonyms.items()):
+            resolved = [self._resolve_synonym(name) for name in names]
+            for j, (name, col) in enumerate(zip(names, resolved)):
+                if col is not None:
+                    self._add_phrase(_tokenize(name), (1, k, j), col)
+            for j, col in enumerate(resolved):
+                if col is not None:
+                    self._add_phrase(_tokenize(key), (1, k, j), col)
+                    break
+
+        self._max_phrase = max((len(p) for p in self._phrases), default=1)
+        # Words that name a column are never taken for values
+        self._name_words = {p[0] for p in self._phrases if len(p) == 1}
+
+    def _add_phrase(self, tokens, rank, col):
+        if not tokens:
+            return
+        current = self._phrases.get(tokens)
+        if current is None or rank < current[0]:
+            self._phrases[tokens] = (rank, col)
+
+    def _resolve_synonym(self, name):
+        needle = name.replace(" ", "").lower()
+        for i, flat in enumerate(self._col_flat):
+            if needle in flat:
+                return self.columns[i]
+        return None
+
+    def add_synonyms(self, key, names):
+        self.synonyms.setdefault(key, []).extend(names)
+        self._build_index()
+        with self._lock:
+            self._sql_cache.clear()
+
+    def _fallback_col(self, word):
+        # First column whose name contains the word (memoized per word)
+        if word in self._word_cache:
+            return self._word_cache[word]
+        col = next((i for i, c in enumerate(self._col_lc) if word in c), None)
+        if len(self._word_cache) >= _WORD_CACHE_LIMIT:
+            self._word_cache.clear()
+        self._word_cache[word] = col
+        return col
+
+    def _match_col(self, query, tokens=None):
+        return self._resolve_col(query, tokens)[0]
+
+    def _resolve_col(self, query, tokens=None):
+        # (column, True if a column name or synonym was mentioned)
+        tokens = _tokenize(query) if tokens is None else tuple(tokens)
+        best = None
+        fallback = None
+        for pos in range(len(tokens)):
+            for size in range(1, min(self._max_phrase, len(tokens) - pos) + 1):
+                phrase = tokens[pos:pos + size]
+                hit = self._phrases.get(phrase)
+                if hit is None and size == 1 and phrase[0].endswith("s"):
+                    hit = self._phrases.get((phrase[0][:-1],))
+                if hit is not None and (best is None or hit[0] < best[0]):
+                    best = hit
+            if best is None:
+                i = self._fallback_col(tokens[pos])
+                if i is not None and (fallback is None or i < fallback):
+                    fallback = i
+        if best is not None:
+            return best[1], True
+        if fallback is not None:
+            return self.columns[fallback], False
+        return (self.columns[0] if self.columns else "*"), False
+
+    # ----------------- Value lookup -------------------
+    def use_values(self, index):
+        if index is not self.values:
+            self.values = index
+            self._values_version = None
+
+    def _value_hit(self, query, col, explicit):
+        # (column, stored value, text as typed) for a known literal. With a
+        # column named in the query only that column's values are considered.
+        if self.values is None or not self.values.columns:
+            return None
+        columns = [col] if explicit else self.columns
+        hit = self.values.match(query, columns, prefer=str(col).lower() if explicit else None,
+                                skip=self._name_words)
+        if hit is None:
+            return None
+        return (self.columns[self._col_lc.index(hit[0])],) + hit[1:]
+
+    def _extract_value(self, query, intent=None):
+        intent = intent or parse_intent(query)
         # Try to extract quoted value
-        quoted = re.findall(r"'([^']+)'", query)
-        if quoted:
-            return quoted[0]
+        if intent.quoted is not None:
+            return intent.quoted
         # Try to extract after keywords
-        match = re.search(r"(from|with|is|equals|containing|named|named as|having|of|by)\s+([A-Za-z0-9\s\+\-]+)", query.lower())
-        if match:
-            return match.group(2).strip()
+        query_lc = query.lower()
+        for pos in intent.value_starts:
+            match = _VALUE_RE.match(query_lc, pos)
+            if match:
+                return match.group(1).strip()
         # Fallback: last word
         return query.strip().split()[-1]
 
+    # ----------------- Translation cache -------------------
     def generate_sql(self, query):
-        query_lc = query.lower()
-        col = self._match_col(query)
-
-        # Handle "more than" or "greater than"
-        match = re.search(r'(more than|greater than|above|over)\s+(\d+)', query_lc)
-        if match and col:
-            return f"SELECT * FROM {self.table_name} WHERE {col} > {match.group(2)};"
-
-        # Handle "less than", "below", "under"
-        match = re.search(r'(less than|below|under)\s+(\d+)', query_lc)
-        if match and col:
-            return f"SELECT * FROM {self.table_name} WHERE {col} < {match.group(2)};"
-
-        # Handle "between ... and ..."
-        match = re.search(r'between\s+(\d+)\s+and\s+(\d+)', query_lc)
-        if match and col:
-            return f"SELECT * FROM {self.table_name} WHERE {col} BETWEEN {match.group(1)} AND {match.group(2)};"
-
-        # Count queries
-        if "how many" in query_lc or "count" in query_lc:
-            val = self._extract_value(query)
-            # If the value is numeric or quoted, add WHERE
-            if col and val and (val.isdigit() or val.replace('.', '', 1).isdigit() or val.isalpha()):
-                return f"SELECT COUNT(*) FROM {self.table_name} WHERE {col} = '{val}';"
-            elif col:
-                return f"SELECT COUNT({col}) FROM {self.table_name};"
-            return f"SELECT COUNT(*) FROM {self.table_name};"
-
-        # Sum queries
-        if "sum" in query_lc:
-            val = self._extract_value(query)
-            if col and val and (val.isdigit() or val.replace('.', '', 1).isdigit() or val.isalpha()):
-                return f"SELECT SUM({col}) FROM {self.table_name} WHERE {col} = '{val}';"
+        key = normalize_query(query)
+        with self._lock:
+            if self.values is not None and self.values.version != self._values_version:
+                # The value index grew since these translations were made
+                self._sql_cache.clear()
+                self._values_version = self.values.version
+            sql = self._sql_cache.get(key)
+            if sql is not None:
+                self._sql_cache.move_to_end(key)
+                self.cache_hits += 1
+                return sql
+            self.cache_misses += 1
+        # Translation only reads the index, so it runs outside the lock
+        sql = self._translate(key)
+        if self.cache_size > 0:
+            with self._lock:
+                self._sql_cache[key] = sql
+                if len(self._sql_cache) > self.cache_size:
+                    self._sql_cache.popitem(last=False)
+        return sql
+
+    def cache_info(self):
+        with self._lock:
+            return {"hits": self.cache_hits, "misses": self.cache_misses,
+                    "size": len(self._sql_cache), "max_size": self.cache_size}
+
+    def _translate(self, query):
+        intent = parse_intent(query)
+        return self.build_sql(intent, query)
+
+    def build_sql(self, intent, query):
+        col, explicit = self._resolve_col(query, intent.tokens)
+        table = self.table_name
+
+        if intent.gt is not None and col:
+            return f"SELECT * FROM {table} WHERE {col} > {intent.gt};"
+        if intent.lt is not None and col:
+            return f"SELECT * FROM {table} WHERE {col} < {intent.lt};"
+        if intent.between is not None and col:
+            return f"SELECT * FROM {table} WHERE {col} BETWEEN {intent.between[0]} AND {intent.between[1]};"
+
+        if intent.aggregate == "COUNT":
+            hit = self._value_hit(query, col, explicit)
+            if hit:
+                return f"SELECT COUNT(*) FROM {table} WHERE {hit[0]} = {_sql_literal(hit[1])};"
+            val = self._extract_value(query, intent)
+            # If the value is numeric or a single word, add WHERE
+            if col and _is_simple_value(val):
+                return f"SELECT COUNT(*) FROM {table} WHERE {col} = '{val}';"
             elif col:
-                return f"SELECT SUM({col}) FROM {self.table_name};"
-
-        # Max queries
-        if "maximum" in query_lc or "highest" in query_lc or "max" in query_lc:
-            if col:
-                return f"SELECT MAX({col}) FROM {self.table_name};"
-
-        # Min queries
-        if "minimum" in query_lc or "lowest" in query_lc or "min" in query_lc:
-            if col:
-                return f"SELECT MIN({col}) FROM {self.table_name};"
-
-        # Top N queries
-        match = re.search(r'(top|first)\s+(\d+)', query_lc)
-        if match:
-            n = match.group(2)
+                return f"SELECT COUNT({col}) FROM {table};"
+            return f"SELECT COUNT(*) FROM {table};"
+        if intent.aggregate == "SUM" and col:
+            val = self._extract_value(query, intent)
+            if _is_simple_value(val):
+                return f"SELECT SUM({col}) FROM {table} WHERE {col} = '{val}';"
+            return f"SELECT SUM({col}) FROM {table};"
+        if intent.extreme is not None and col:
+            return f"SELECT {intent.extreme}({col}) FROM {table};"
+
+        if intent.top is not None:
             order_col = col if col else self.columns[0]
-            return f"SELECT * FROM {self.table_name} ORDER BY {order_col} DESC LIMIT {n};"
+            return f"SELECT * FROM {table} ORDER BY {order_col} DESC LIMIT {intent.top};"
+
+        hit = self._value_hit(query, col, explicit)
+        if intent.like and col:
+            if hit:
+                return f"SELECT * FROM {table} WHERE {hit[0]} LIKE {_sql_literal('%' + hit[2] + '%')};"
+            val = self._extract_value(query, intent)
+            return f"SELECT * FROM {table} WHERE {col} LIKE '%{val}%';"
+        if hit:
+            return f"SELECT * FROM {table} WHERE {hit[0]} = {_sql_literal(hit[1])};"
+        if intent.equals and col:
+            val = self._extract_value(query, intent)
+            return f"SELECT * FROM {table} WHERE {col} = '{val}';"
+
+        # Show all / default fallback
+        return f"SELECT * FROM {table};"
+
+    def generate_sql_many(self, queries):
+        return [self.generate_sql(query) for query in queries]
+
+
+# ----------------- Translator registry -------------------
+# Shares NL2SQL instances (and their SQL caches) per (table, schema fingerprint)
+class TranslatorRegistry:
+    def __init__(self, max_translators=32, cache_size=512):
+        self.max_translators = max_translators
+        self.cache_size = cache_size
+        self._translators = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, table_name, columns):
+        key = (table_name, schema_fingerprint(columns))
+        with self._lock:
+            translator = self._translators.get(key)
+            if translator is None:
+                translator = NL2SQL(table_name, list(columns), cache_size=self.cache_size)
+                self._translators[key] = translator
+                if len(self._translators) > self.max_translators:
+                    self._translators.popitem(last=False)
+            else:
+                self._translators.move_to_end(key)
+            return translator
+
+    def invalidate(self, table_name=None):
+        with self._lock:
+            for key in [k for k in self._translators if table_name is None or k[0] == table_name]:
+                del self._translators[key]
+
+    def stats(self):
+        with self._lock:
+            infos = [t.cache_info() for t in self._translators.values()]
+        return {"translators": len(infos), "hits": sum(i["hits"] for i in infos),
+                "misses": sum(i["misses"] for i in infos)}
+
+
+translators = TranslatorRegistry()
+
+
+def get_translator(table_name, columns):
+    return translators.get(table_name, columns)
+
+
+# ----------------- File workspace -------------------
+# Module-level helpers used by test_load.py: files are ingested into a
+# workspace SQLite database and the last loaded table is remembered.
+workspace = {"db_path": loader.WORKSPACE_DB, "table": None}
+
+
+def load_file_to_sqlite(file_path, db_path=loader.WORKSPACE_DB, **kwargs):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in (".db", ".sqlite"):
+        tables = db.get_tables(file_path)
+        if not tables:
+            raise ValueError("No tables found in database.")
+        db_path, table = file_path, tables[0]
+    else:
+        table = loader.load_file_to_sqlite(file_path, db_path=db_path, **kwargs)
+    workspace.update(db_path=db_path, table=table)
+    translators.invalidate(table)
+    return table
+
+
+def get_tables(db_path=None):
+    return db.get_tables(db_path or workspace["db_path"])
 
-        # WHERE with contains/like
-        if col and ("contains" in query_lc or "like" in query_lc):
-            val = self._extract_value(query)
-            return f"SELECT * FROM {self.table_name} WHERE {col} LIKE '%{val}%';"
 
-        # WHERE with equals/is/with/having
-        if col and ("equals" in query_lc or "is" in query_lc or "with" in query_lc or "held" in query_lc or "having" in query_lc or "from" in query_lc):
-            val = self._extract_value(query)
-            return f"SELECT * FROM {self.table_name} WHERE {col} = '{val}';"
+def get_columns(table=None, db_path=None):
+    return db.get_columns(db_path or workspace["db_path"], table or workspace["table"])
 
-        # Show all
-        if "all" in query_lc or "show" in query_lc or self.table_name.lower() in query_lc:
-            return f"SELECT * FROM {self.table_name};"
 
-        # Default fallback
-        return f"SELECT * FROM {self.table_name};"
+def convert_to_sql(query, table=None, db_path=None):
+    table = table or workspace["table"]
+    if table is None:
+        raise ValueError("No table loaded.")
+    columns = get_columns(table, db_path)
+    return get_translator(table, [col.lower() for col in columns]).generate_sql(query)
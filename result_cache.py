@@ -0,0 +1,147 @@
+import os
+import re
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+# Larger results keep streaming from the cursor and are never cached
+MAX_CACHED_ROWS = 50000
+SIZE_SAMPLE_ROWS = 100
+
+_QUOTED_RE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+_WRITE_RE = re.compile(r"\b(?:insert|update|delete|create|drop|alter|attach|pragma|vacuum)\b"
+                       r"|\breplace\b(?!\s*\()")
+# Results that change between runs on unchanged data
+_VOLATILE_RE = re.compile(r"\b(?:random|randomblob|changes|total_changes|last_insert_rowid)\s*\("
+                          r"|'now'|\bcurrent_(?:time|date|timestamp)\b")
+
+
+def normalize_sql(sql):
+    # Lowercases and collapses whitespace outside string literals; identifiers
+    # and keywords are case-insensitive in SQLite, literals are not
+    parts = _QUOTED_RE.split(sql.strip().rstrip(";").strip())
+    return "".join(p if i % 2 else " ".join(p.lower().split()) for i, p in enumerate(parts))
+
+
+def is_cacheable(sql):
+    key = normalize_sql(sql)
+    if not key.startswith(("select", "with")):
+        return False
+    bare = _QUOTED_RE.sub("''", key)
+    return not (_WRITE_RE.search(bare) or _VOLATILE_RE.search(key))
+
+
+def rows_size(rows):
+    # Rough in-memory size of a list of row tuples, from a sample
+    if not rows:
+        return sys.getsizeof(rows)
+    sample = rows[:SIZE_SAMPLE_ROWS]
+    per_row = sum(sys.getsizeof(r) + sum(sys.getsizeof(v) for v in r) for r in sample) / len(sample)
+    return sys.getsizeof(rows) + int(per_row * len(rows))
+
+
+def frame_size(frame):
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+# ----------------- Result Cache -------------------
+# LRU of query results keyed by (source, normalized SQL). Every entry carries
+# the version of its source when it was stored; a lookup with a different
+# version is a miss and drops the entry.
+class ResultCache:
+    def __init__(self, max_bytes=MAX_CACHE_BYTES, max_rows=MAX_CACHED_ROWS):
+        self.max_bytes = max_bytes
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        self._watchers = {}
+        self._lock = threading.Lock()
+
+    # ----------------- SQLite versions -------------------
+    def sqlite_version(self, db_path):
+        # PRAGMA data_version only moves for commits made by *other*
+        # connections, so each database gets its own watcher connection that
+        # never writes. mtime/size catch changes made while it was closed.
+        path = os.path.abspath(db_path)
+        with self._lock:
+            conn = self._watchers.get(path)
+            if conn is None:
+                conn = sqlite3.connect(Path(path).as_uri() + "?mode=ro", uri=True,
+                                       check_same_thread=False)
+                self._watchers[path] = conn
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        stamps = []
+        for name in (path, path + "-wal"):
+            try:
+                st = os.stat(name)
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append(None)
+        return (data_version, *stamps)
+
+    def get_sql(self, db_path, sql):
+        # Returns (cached (headers, rows) or None, version). Pass the version
+        # on to put_sql so rows read after a concurrent write are not stored
+        # under the newer version.
+        version = self.sqlite_version(db_path)
+        return self.get(os.path.abspath(db_path), sql, version), version
+
+    def put_sql(self, db_path, sql, version, headers, rows):
+        if len(rows) > self.max_rows:
+            return False
+        return self.put(os.path.abspath(db_path), sql, version, (list(headers), rows), rows_size(rows))
+
+    # ----------------- Entries -------------------
+    def get(self, source, sql, version):
+        key = (source, normalize_sql(sql))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != version:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, source, sql, version, value, size):
+        if not is_cacheable(sql) or size > self.max_bytes:
+            return False
+        key = (source, normalize_sql(sql))
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (version, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+        return True
+
+    def _drop(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def invalidate(self, source=None):
+        with self._lock:
+            for key in [k for k in self._entries if source is None or k[0] == source]:
+                self._drop(key)
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            for conn in self._watchers.values():
+                conn.close()
+            self._watchers.clear()
+
+
+results = ResultCache()
@@ -0,0 +1,231 @@
+import tkinter as tk
+from tkinter import ttk
+
+PAGE_SIZE = 200
+DEFAULT_ROW_HEIGHT = 20
+# Rows a CursorSource keeps around the visible area, and how far past the
+# cursor a jump may land before it is served by a LIMIT/OFFSET query
+WINDOW_ROWS = 10 * PAGE_SIZE
+FAR_ROWS = 5 * PAGE_SIZE
+
+
+# ----------------- Row Sources -------------------
+# A source knows its column names, its total row count (None while still
+# unknown) and how to return rows[start:stop] on demand.
+class FrameSource:
+    def __init__(self, df):
+        self.df = df
+        self.columns = [str(c) for c in df.columns]
+
+    def total(self):
+        return len(self.df)
+
+    def rows(self, start, stop):
+        # Missing values are kept as NaN/<NA> in the frame and shown blank
+        page = self.df.iloc[start:stop].astype(object)
+        return page.where(page.notna(), "").values.tolist()
+
+
+class ListSource:
+    def __init__(self, columns, rows):
+        self.columns = list(columns)
+        self._rows = rows
+
+    def total(self):
+        return len(self._rows)
+
+    def rows(self, start, stop):
+        return self._rows[start:stop]
+
+
+class CursorSource:
+    # Pulls rows from a DB-API cursor in fetchmany pages as the view reaches
+    # them. With query = (sql, db_path), only a window of rows around the
+    # visible area is kept, and a jump behind the window or far ahead of the
+    # cursor re-runs the query with LIMIT/OFFSET instead of fetching every
+    # row in between. Without it every row read so far is kept. Rows read
+    # count towards budget (a cost_guard.Budget); once it is exceeded no
+    # more are read and stopped says why.
+    def __init__(self, cursor, total=None, page_size=PAGE_SIZE, query=None, budget=None):
+        self.cursor = cursor
+        self.columns = [d[0] for d in cursor.description] if cursor.description else []
+        self.page_size = page_size
+        self.query = query
+        self.budget = budget
+        self.stopped = None
+        self._total = total
+        # _rows holds rows[_start:_start + len(_rows)]
+        self._start = 0
+        self._rows = []
+        self._read = 0
+        self._seen = 0
+        self._done = False
+
+    def total(self):
+        if self._total is not None:
+            return self._total
+        return self._read if self._done else None
+
+    def loaded(self):
+        # Rows known to exist so far
+        return self._seen
+
+    def rows(self, start, stop):
+        total = self.total()
+        if total is not None:
+            stop = min(stop, total)
+        end = self._start + len(self._rows)
+        if start >= stop or (self._start <= start and stop <= end) or self.stopped:
+            return self._rows[max(0, start - self._start):max(0, stop - self._start)]
+        # Cursor rows extend the window only while it ends where the cursor is
+        first = self._start if end == self._read else self._read
+        if not self._done and (self.query is None or first <= start and stop <= self._read + FAR_ROWS):
+            self._read_cursor(start, stop)
+        elif self.query is not None:
+            self._read_window(start, stop)
+        self._seen = max(self._seen, self._read, self._start + len(self._rows))
+        return self._rows[max(0, start - self._start):max(0, stop - self._start)]
+
+    def _count(self, n):
+        if self.budget is not None:
+            self.budget.add_rows(n)
+            if self.budget.is_set():
+                self.stopped = self.budget.message() or "Stopped"
+        return self.stopped is not None
+
+    def _read_cursor(self, start, stop):
+        if self._start + len(self._rows) != self._read:
+            self._start, self._rows = self._read, []
+        while self._read < stop:
+            batch = self.cursor.fetchmany(max(self.page_size, stop - self._read))
+            if not batch:
+                self._done = True
+                break
+            self._rows.extend(batch)
+            self._read += len(batch)
+            if self._count(len(batch)):
+                break
+        if self.query is not None:
+            # Drop rows well above the visible area
+            drop = min(len(self._rows) - WINDOW_ROWS, start - self.page_size - self._start)
+            if drop > 0:
+                del self._rows[:drop]
+                self._start += drop
+
+    def _read_window(self, start, stop):
+        from db import pool
+        sql, db_path = self.query
+        begin = max(0, start - self.page_size)
+        limit = stop - begin + self.page_size
+        # On its own line so a trailing -- comment cannot swallow the bracket
+        paged = f"SELECT * FROM ({sql.strip().rstrip(';')}\n) LIMIT {limit} OFFSET {begin}"
+        with pool.connection(db_path) as conn:
+            rows = conn.execute(paged).fetchall()
+        self._start, self._rows = begin, rows
+        self._count(len(rows))
+        if rows and len(rows) < limit and self._total is None:
+            self._total = begin + len(rows)
+
+
+# ----------------- Virtual Treeview -------------------
+class VirtualResultView:
+    # Keeps only the visible window of rows as Treeview items and maps the
+    # vertical scrollbar onto the full row count of the source.
+    def __init__(self, tree, scrollbar, on_change=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.on_change = on_change
+        self.source = None
+        self.top = 0
+        self._items = []
+        scrollbar.configure(command=self._on_scrollbar)
+        tree.configure(yscrollcommand=lambda *args: None)
+        tree.bind("<Configure>", lambda e: self.render())
+        tree.bind("<MouseWheel>", self._on_wheel)
+        tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        tree.bind("<Button-5>", lambda e: self.scroll(3))
+        tree.bind("<Prior>", lambda e: self.scroll(-self.visible_rows()))
+        tree.bind("<Next>", lambda e: self.scroll(self.visible_rows()))
+
+    def set_source(self, source):
+        self.source = source
+        self.top = 0
+        self.tree.delete(*self.tree.get_children())
+        self._items = []
+        self.tree["columns"] = source.columns
+        self.tree["show"] = "headings"
+        for col in source.columns:
+            self.tree.heading(col, text=col)
+        self.render()
+
+    def clear(self):
+        self.source = None
+        self.tree.delete(*self.tree.get_children())
+        self._items = []
+        self.scrollbar.set(0, 1)
+
+    def visible_rows(self):
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return int(self.tree.cget("height"))
+        row_height = ttk.Style().lookup("Treeview", "rowheight") or DEFAULT_ROW_HEIGHT
+        # Leave room for the heading row
+        return max(1, height // int(row_height) - 1)
+
+    def _extent(self):
+        total = self.source.total()
+        if total is not None:
+            return total, True
+        # Unknown length: pretend there is one more page beyond what is loaded
+        return max(self.source.loaded(), self.top + self.visible_rows()) + PAGE_SIZE, False
+
+    def render(self):
+        if self.source is None:
+            return
+        count = self.visible_rows()
+        rows = self.source.rows(self.top, self.top + count)
+        if not rows and self.top > 0:
+            # Ran off the end of a source whose length was unknown
+            self.top = max(0, self.top - count)
+            rows = self.source.rows(self.top, self.top + count)
+
+        while len(self._items) < len(rows):
+            self._items.append(self.tree.insert("", tk.END, values=()))
+        while len(self._items) > len(rows):
+            self.tree.delete(self._items.pop())
+        for iid, row in zip(self._items, rows):
+            self.tree.item(iid, values=list(row))
+
+        extent, exact = self._extent()
+        if extent:
+            self.scrollbar.set(self.top / extent, min(1.0, (self.top + len(rows)) / extent))
+        else:
+            self.scrollbar.set(0, 1)
+        if self.on_change:
+            self.on_change(self.top, len(rows), self.source.total())
+
+    def scroll(self, delta):
+        if self.source is None:
+            return
+        self.moveto_row(self.top + delta)
+
+    def moveto_row(self, row):
+        extent, _ = self._extent()
+        self.top = max(0, min(int(row), extent - self.visible_rows()))
+        self.render()
+
+    def _on_scrollbar(self, action, *args):
+        if self.source is None:
+            return
+        if action == "moveto":
+            extent, _ = self._extent()
+            self.moveto_row(float(args[0]) * extent)
+        elif action == "scroll":
+            step = int(args[0])
+            if args[1] == "pages":
+                step *= self.visible_rows()
+            self.scroll(step)
+
+    def _on_wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+import nl2sql
+
+DEFAULT_PORT = 8765
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 5000
+MAX_BODY = 1024 * 1024
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+               504: "Gateway Timeout"}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ----------------- Query Service -------------------
+# Translates with the shared NL2SQL registry and runs statements on pooled
+# read-only connections from a bounded thread pool. Usable without HTTP.
+class QueryService:
+    def __init__(self, db_path, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="askdb-server")
+        self.slots = asyncio.Semaphore(concurrency)
+        self.pool = db.ConnectionPool(max_idle=concurrency)
+        # Value indexes are built here, never inside a request
+        self.indexer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="askdb-index")
+        self.closing = threading.Event()
+
+    def tables(self):
+        return {t: db.get_columns(self.db_path, t) for t in db.get_tables(self.db_path)}
+
+    def translate(self, question, table=None):
+        tables = db.get_tables(self.db_path)
+        table = table or (tables[0] if tables else None)
+        if table not in tables:
+            raise RequestError(404, f"no such table: {table}")
+        columns = db.get_columns(self.db_path, table)
+        translator = nl2sql.get_translator(table, [c.lower() for c in columns])
+        translator.use_values(self.value_index(table))
+        return translator.generate_sql(question)
+
+    def value_index(self, table):
+        # Starts filling the table's index in the background and returns it
+        # as it is; translations made meanwhile just see fewer values
+        index = nl2sql.get_value_index(os.path.abspath(self.db_path), table)
+        if not index.started:
+            index.started = True
+            self.indexer.submit(nl2sql.build_value_index_sqlite, index, self.db_path, table, self.closing)
+        return index
+
+    def _run_page(self, sql, page, page_size, cancel):
+        inner = sql.strip().rstrip(";")
+        paged = f"SELECT * FROM ({inner}) LIMIT {page_size + 1} OFFSET {page * page_size}"
+        with self.pool.connection(self.db_path) as conn:
+            db.watch_cancel(conn, cancel)
+            start = time.perf_counter()
+            cursor = conn.execute(paged)
+            rows = cursor.fetchall()
+            elapsed = (time.perf_counter() - start) * 1000
+            headers = [d[0] for d in cursor.description] if cursor.description else []
+        return {
+            "columns": headers,
+            "rows": [list(r) for r in rows[:page_size]],
+            "page": page,
+            "page_size": page_size,
+            "has_more": len(rows) > page_size,
+            "execute_ms": round(elapsed, 2),
+        }
+
+    async def query(self, request):
+        question, sql = request.get("question"), request.get("sql")
+        if not question and not sql:
+            raise RequestError(400, "expected 'question' or 'sql'")
+        try:
+            page = int(request.get("page", 0))
+            page_size = min(int(request.get("page_size", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+            timeout = float(request.get("timeout", self.timeout))
+        except (TypeError, ValueError):
+            raise RequestError(400, "page, page_size and timeout must be numbers")
+        if page < 0 or page_size <= 0:
+            raise RequestError(400, "page must be >= 0 and page_size > 0")
+        if not timeout > 0:
+            raise RequestError(400, "timeout must be > 0")
+
+        loop = asyncio.get_running_loop()
+        cancel = threading.Event()
+        started = time.perf_counter()
+
+        async def work():
+            translate_ms = 0.0
+            statement = sql
+            if not statement:
+                t0 = time.perf_counter()
+                statement = await loop.run_in_executor(
+                    self.executor, self.translate, question, request.get("table"))
+                translate_ms = (time.perf_counter() - t0) * 1000
+            if not statement.lstrip().lower().startswith(("select", "with")):
+                raise RequestError(403, "only SELECT statements are allowed")
+            result = await loop.run_in_executor(
+                self.executor, self._run_page, statement, page, page_size, cancel)
+            result.update(sql=statement, translate_ms=round(translate_ms, 2))
+            return result
+
+        result = await self._bounded(work, timeout, cancel)
+        result["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    async def call(self, fn, *args):
+        # A blocking call on the worker pool, under the same slots and
+        # timeout as queries
+        loop = asyncio.get_running_loop()
+        return await self._bounded(lambda: loop.run_in_executor(self.executor, fn, *args), self.timeout)
+
+    async def _bounded(self, work, timeout, cancel=None):
+        # Holds a concurrency slot while work() runs and gives up after
+        # timeout; cancel stops a statement still running on a worker thread
+        async def run():
+            async with self.slots:
+                return await work()
+
+        try:
+            return await asyncio.wait_for(run(), timeout)
+        except asyncio.TimeoutError:
+            if cancel is not None:
+                cancel.set()
+            raise RequestError(504, f"request exceeded {timeout:g}s")
+
+    def close(self):
+        self.closing.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.indexer.shutdown(wait=False, cancel_futures=True)
+        self.pool.close_all()
+
+
+# ----------------- HTTP Front End -------------------
+async def _read_request(reader):
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    if not request_line:
+        return None
+    method, target, _ = (request_line.split(" ", 2) + ["", ""])[:3]
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise RequestError(400, "invalid Content-Length")
+    if length > MAX_BODY:
+        raise RequestError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], body
+
+
+def _response(status, payload):
+    body = json.dumps(payload, default=str).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+async def _dispatch(service, method, path, body):
+    if path == "/health":
+        return {"status": "ok", "db": service.db_path, "translators": nl2sql.translators.stats()}
+    if path == "/tables":
+        return await service.call(service.tables)
+    if path in ("/query", "/translate"):
+        if method != "POST":
+            raise RequestError(405, "use POST")
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise RequestError(400, "body must be JSON")
+        if path == "/translate":
+            if not request.get("question"):
+                raise RequestError(400, "expected 'question'")
+            sql = await service.call(service.translate, request["question"], request.get("table"))
+            return {"sql": sql}
+        return await service.query(request)
+    raise RequestError(404, f"no route for {path}")
+
+
+def make_handler(service):
+    async def handle(reader, writer):
+        try:
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    return
+                status, payload = 200, await _dispatch(service, *request)
+            except RequestError as e:
+                status, payload = e.status, {"error": str(e)}
+            except sqlite3.Error as e:
+                status, payload = 400, {"error": str(e)}
+            except Exception as e:
+                status, payload = 500, {"error": str(e)}
+            writer.write(_response(status, payload))
+            await writer.drain()
+        finally:
+            writer.close()
+    return handle
+
+
+async def serve(db_path, host="127.0.0.1", port=DEFAULT_PORT, concurrency=DEFAULT_CONCURRENCY,
+                timeout=DEFAULT_TIMEOUT):
+    # Returns the started asyncio server and its service; port=0 picks a free port
+    service = QueryService(db_path, concurrency=concurrency, timeout=timeout)
+    server = await asyncio.start_server(make_handler(service), host, port)
+    return server, service
+
+
+async def _main(args):
+    db_path = args.db
+    if os.path.splitext(db_path)[1].lower() not in (".db", ".sqlite"):
+        # CSV/Excel sources are ingested into the workspace database first
+        nl2sql.load_file_to_sqlite(db_path)
+        db_path = nl2sql.workspace["db_path"]
+    server, service = await serve(db_path, args.host, args.port, args.concurrency, args.timeout)
+    host, port = server.sockets[0].getsockname()[:2]
+    print(f"AskDB service on http://{host}:{port} ({db_path})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless AskDB query service")
+    parser.add_argument("db", help="SQLite database, or a CSV/Excel file to ingest")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
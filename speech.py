@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+
+IDLE_POLL = 0.05
+PROMPT_TIMEOUT = 5.0
+
+
+# ----------------- Text to Speech -------------------
+# One thread owns the pyttsx3 engine and drives it with its external loop
+# (startLoop(False) + iterate()), so a newer message can stop the current
+# one. Only the latest pending message is kept; stale ones are dropped.
+class SpeechWorker:
+    def __init__(self, engine_factory=None):
+        self.engine_factory = engine_factory or _pyttsx3_engine
+        self._pending = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self.available = True
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="askdb-speech", daemon=True)
+            self._thread.start()
+        return self
+
+    def say(self, text):
+        # Returns an Event that is set once the text was spoken or replaced
+        done = threading.Event()
+        with self._cond:
+            if self._pending is not None:
+                self._pending[1].set()
+            self._pending = (text, done)
+            self._cond.notify()
+        if self._thread is None:
+            self.start()
+        if not self.available:
+            done.set()
+        return done
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _take(self, block):
+        with self._cond:
+            while block and self._pending is None and not self._stopped:
+                self._cond.wait()
+            item, self._pending = self._pending, None
+            return item
+
+    def _run(self):
+        try:
+            engine = self.engine_factory()
+            engine.startLoop(False)
+        except Exception:
+            # No TTS on this machine: drain messages silently
+            self.available = False
+            while not self._stopped:
+                item = self._take(block=True)
+                if item:
+                    item[1].set()
+            return
+        current = None
+        try:
+            while not self._stopped:
+                item = self._take(block=current is None)
+                if item is not None:
+                    if current is not None:
+                        engine.stop()
+                        current.set()
+                    text, current = item
+                    engine.say(text)
+                engine.iterate()
+                if current is not None and not engine.isBusy():
+                    current.set()
+                    current = None
+                time.sleep(IDLE_POLL)
+        finally:
+            if current is not None:
+                current.set()
+            engine.endLoop()
+
+
+def _pyttsx3_engine():
+    import pyttsx3
+    return pyttsx3.init()
+
+
+# ----------------- Speech to Text -------------------
+# Backends turn one utterance into text. They are looked up by name so an
+# offline or scripted stand-in can replace the Google recognizer.
+class GoogleBackend:
+    def __init__(self):
+        import speech_recognition as sr
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+
+    def capture(self):
+        with self.sr.Microphone() as source:
+            return self.recognizer.listen(source)
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_google(audio)
+
+
+class SphinxBackend(GoogleBackend):
+    def recognize(self, audio):
+        return self.recognizer.recognize_sphinx(audio)
+
+
+class StaticBackend:
+    # Returns scripted transcripts in order; for offline use and tests
+    def __init__(self, responses=None):
+        env = os.environ.get("ASKDB_SPEECH_TEXT", "")
+        self.responses = list(responses if responses is not None else filter(None, env.split("|")))
+
+    def capture(self):
+        return None
+
+    def recognize(self, audio):
+        if not self.responses:
+            raise LookupError("no scripted response")
+        return self.responses.pop(0)
+
+
+BACKENDS = {"google": GoogleBackend, "sphinx": SphinxBackend, "static": StaticBackend}
+
+
+def make_backend(name=None):
+    return BACKENDS[name or os.environ.get("ASKDB_SPEECH_BACKEND", "google")]()
+
+
+class Listener:
+    def __init__(self, backend=None, speaker=None):
+        self._backend = backend
+        self.speaker = speaker
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = make_backend()
+        return self._backend
+
+    def listen(self, prompt="Speak your query now.", trace=None):
+        # Blocking; run it on a worker thread. A timing.QueryTrace gets the
+        # capture and recognition times as "listen" and "speech_to_text".
+        if self.speaker is not None and prompt:
+            # Let the prompt finish so the microphone does not record it
+            self.speaker.say(prompt).wait(PROMPT_TIMEOUT)
+        try:
+            backend = self.backend
+            start = time.perf_counter()
+            audio = backend.capture()
+            captured = time.perf_counter()
+            text = backend.recognize(audio)
+            if trace is not None:
+                trace.add("listen", (captured - start) * 1000)
+                trace.add("speech_to_text", (time.perf_counter() - captured) * 1000)
+            return text
+        except Exception:
+            return "Could not understand audio."
@@ -0,0 +1,38 @@
+import importlib
+import json
+import os
+import sys
+import time
+
+# Import this module first; marks are milliseconds since then
+START = time.perf_counter()
+REPORT_PATH = os.path.join(os.path.expanduser("~"), ".askdb", "startup.jsonl")
+# Loaded in the background once the window is up
+HEAVY_MODULES = ("numpy", "pandas", "matplotlib")
+
+marks = []
+
+
+def mark(label):
+    marks.append((label, round((time.perf_counter() - START) * 1000, 1)))
+
+
+def preload(modules=HEAVY_MODULES):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        mark(f"loaded {name}")
+
+
+def report(path=REPORT_PATH):
+    print("Startup: " + ", ".join(f"{label} {ms:.0f} ms" for label, ms in marks), file=sys.stderr)
+    record = {"time": time.time(), "marks": dict(marks)}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError:
+        pass
+    return record
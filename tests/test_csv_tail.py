@@ -0,0 +1,72 @@
+import pandas as pd
+
+import csv_tail
+
+
+def _write(path, text, mode="w"):
+    with open(path, mode, newline="") as f:
+        f.write(text)
+
+
+def test_last_line_without_newline_is_loaded(tmp_path):
+    path = tmp_path / "scores.csv"
+    _write(path, "city,runs\nMumbai,10\nDelhi,20")
+    tail = csv_tail.CsvTail.start(str(path))
+    assert len(tail.read_frame()) == len(pd.read_csv(path)) == 2
+    assert list(tail.rows())[-1] == ["Delhi", "20"]
+
+
+def test_append_after_unterminated_line(tmp_path):
+    path = tmp_path / "scores.csv"
+    _write(path, "city,runs\nMumbai,10\nDelhi,20")
+    tail = csv_tail.CsvTail.start(str(path))
+    _write(path, "\nPune,30\n", "a")
+    kind, data = tail.poll()
+    assert kind == "append"
+    assert csv_tail.parse_rows(data) == [["Pune", "30"]]
+
+
+def test_line_being_written_waits_for_its_newline(tmp_path):
+    path = tmp_path / "scores.csv"
+    _write(path, "city,runs\nMumbai,10\n")
+    tail = csv_tail.CsvTail.start(str(path))
+    _write(path, "B,2\nC,", "a")
+    kind, data = tail.poll()
+    assert kind == "append"
+    assert csv_tail.parse_rows(data) == [["B", "2"]]
+    _write(path, "3", "a")
+    assert tail.poll()[0] == "same"
+    _write(path, "\n", "a")
+    kind, data = tail.poll()
+    assert kind == "append"
+    assert csv_tail.parse_rows(data) == [["C", "3"]]
+
+
+def test_extended_first_load_line_reloads(tmp_path):
+    # The unterminated last row was loaded as it was; growing it means the
+    # loaded row was incomplete
+    path = tmp_path / "scores.csv"
+    _write(path, "city,runs\nMumbai,10\nDelhi,2")
+    tail = csv_tail.CsvTail.start(str(path))
+    _write(path, "0\n", "a")
+    assert tail.poll()[0] == "reload"
+
+
+def test_appended_rows_match_full_read(tmp_path):
+    path = tmp_path / "scores.csv"
+    _write(path, "city,runs\n" + "".join(f"C{i % 3},{i}\n" for i in range(100)))
+    tail = csv_tail.CsvTail.start(str(path))
+    frame = tail.read_frame()
+    _write(path, "New,5000\nC1,7\n", "a")
+    kind, data = tail.poll()
+    frame = csv_tail.append_frame(frame, csv_tail.parse_frame(data, frame.columns))
+    assert frame.astype(str).values.tolist() == pd.read_csv(path).astype(str).values.tolist()
+    assert tail.poll()[0] == "same"
+
+
+def test_truncation_reloads(tmp_path):
+    path = tmp_path / "scores.csv"
+    _write(path, "city,runs\nMumbai,10\nDelhi,20\n")
+    tail = csv_tail.CsvTail.start(str(path))
+    _write(path, "city,runs\n")
+    assert tail.poll()[0] == "reload"
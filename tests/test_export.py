@@ -0,0 +1,59 @@
+import sqlite3
+
+import pytest
+
+import export
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "t.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_write_statements_are_not_exported(db_path, tmp_path):
+    with pytest.raises(RuntimeError):
+        export.export_query("INSERT INTO t VALUES (2)", db_path, str(tmp_path / "out.csv"))
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+    conn.close()
+    assert not (tmp_path / "out.csv").exists()
+
+
+def test_parquet_widens_mixed_columns(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "mixed.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (score INTEGER, avg INTEGER)")
+    rows = [(i, i) for i in range(10000)] + [("n/a", 2.5), (None, None)]
+    conn.executemany("INSERT INTO t VALUES (?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+    out = str(tmp_path / "out.parquet")
+    export.export_query("SELECT * FROM t", path, out, chunk_size=1000)
+    table = pq.read_table(out)
+    assert str(table.schema.field("score").type) == "string"
+    assert str(table.schema.field("avg").type) == "double"
+    assert table.column("score").to_pylist()[-3:] == ["9999", "n/a", None]
+    assert table.column("avg").to_pylist()[-2:] == [2.5, None]
+
+
+def test_cancelled_export_leaves_no_file(tmp_path):
+    class Cancel:
+        calls = 0
+
+        def is_set(self):
+            self.calls += 1
+            return self.calls > 2
+
+    chunks = ([(i,)] for i in range(10))
+    out = tmp_path / "out.csv.gz"
+    with pytest.raises(export.ExportCancelled):
+        export.export_chunks(str(out), ["x"], chunks, cancel=Cancel())
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,23 @@
+import pandas as pd
+
+import frame_sql
+import loader
+from nl2sql import NL2SQL
+
+
+def test_hyphenated_file_name_runs_vectorized(tmp_path):
+    path = tmp_path / "IPL-2020.csv"
+    pd.DataFrame({"city": ["Mumbai", "Delhi", "Mumbai"], "runs": [10, 20, 30]}).to_csv(path, index=False)
+    frame = pd.read_csv(path)
+    table = loader.table_name_for(str(path))
+    assert table == "IPL_2020"
+
+    for question in ("show all", "runs above 15"):
+        sql = NL2SQL(table, ["city", "runs"]).generate_sql(question)
+        assert frame_sql.parse(sql)["table"] == table
+        result = frame_sql.run_frame_sql(frame, sql, table)
+        assert len(result) == (3 if question == "show all" else 2)
+
+
+def test_name_with_spaces(tmp_path):
+    assert loader.table_name_for(str(tmp_path / "my data.xlsx")) == "my_data"
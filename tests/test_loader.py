@@ -0,0 +1,30 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+import loader
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SIGTERM cannot be handled on Windows")
+def test_terminated_folder_load_removes_its_scratch_directory(tmp_path):
+    folder = tmp_path / "in"
+    folder.mkdir()
+    for i in range(4):
+        with open(folder / f"part_{i}.csv", "w") as f:
+            f.write("a,b,c\n")
+            f.writelines(f"{n},x{n},{n * 0.5}\n" for n in range(200000))
+    db_path = tmp_path / "workspace.db"
+    proc = subprocess.Popen([sys.executable, os.path.abspath(loader.__file__), str(folder), "--db", str(db_path)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + 30
+    while not any(p.name.startswith("askdb-ingest-") for p in tmp_path.iterdir()):
+        assert time.monotonic() < deadline and proc.poll() is None
+        time.sleep(0.05)
+    proc.send_signal(signal.SIGTERM)
+    proc.communicate(timeout=60)
+    assert proc.returncode != 0
+    assert not any(p.name.startswith("askdb-ingest-") for p in tmp_path.iterdir())
@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import nl2sql
+from nl2sql import NL2SQL, TranslatorRegistry
+
+
+def test_shared_translator_counts_every_call():
+    translator = NL2SQL("matches", ["city", "season", "winner"], cache_size=8)
+    questions = [f"matches in season above {2000 + i % 20}" for i in range(4000)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(translator.generate_sql, questions))
+    assert results[5] == translator.generate_sql(questions[5])
+    info = translator.cache_info()
+    assert info["hits"] + info["misses"] == len(questions) + 1
+    assert info["size"] <= 8
+
+
+def test_registry_and_value_indexes_under_threads():
+    registry = TranslatorRegistry(max_translators=4)
+
+    def work(i):
+        registry.get(f"t{i % 10}", ["a", "b"]).generate_sql("show all")
+        nl2sql.get_value_index(f"test:{i % 40}", "t")
+        if i % 7 == 0:
+            registry.invalidate(f"t{i % 10}")
+            nl2sql.drop_value_indexes(f"test:{i % 40}")
+        return True
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(executor.map(work, range(5000)))
+    assert registry.stats()["translators"] <= 4
+    assert len(nl2sql.value_indexes) <= nl2sql.MAX_VALUE_INDEXES
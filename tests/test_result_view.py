@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+
+result_view = pytest.importorskip("result_view")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "t.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(100000)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _source(db_path, total=None):
+    sql = "SELECT x FROM t ORDER BY x"
+    cursor = sqlite3.connect(db_path).execute(sql)
+    return result_view.CursorSource(cursor, total=total, query=(sql, db_path))
+
+
+def test_far_jump_does_not_read_every_row(db_path):
+    source = _source(db_path)
+    assert source.rows(0, 20) == [(i,) for i in range(20)]
+    assert source.rows(90000, 90020) == [(i,) for i in range(90000, 90020)]
+    assert source.rows(10, 15) == [(i,) for i in range(10, 15)]
+    assert source._read < result_view.WINDOW_ROWS
+    assert len(source._rows) <= result_view.WINDOW_ROWS
+
+
+def test_scrolling_keeps_a_bounded_window(db_path):
+    source = _source(db_path, total=100000)
+    for top in range(0, 20000, 30):
+        assert source.rows(top, top + 30)[0] == (top,)
+    assert len(source._rows) <= result_view.WINDOW_ROWS + 30
+
+
+def test_jump_past_the_end_finds_the_total(db_path):
+    source = _source(db_path)
+    assert source.rows(99990, 100010) == [(i,) for i in range(99990, 100000)]
+    assert source.total() == 100000
+
+
+def test_scrolling_stops_at_the_row_budget(db_path):
+    from cost_guard import Budget
+    sql = "SELECT x FROM t"
+    budget = Budget(seconds=0, rows=1000)
+    cursor = sqlite3.connect(db_path).execute(sql)
+    source = result_view.CursorSource(cursor, total=100000, query=(sql, db_path), budget=budget)
+    for top in range(0, 5000, 200):
+        source.rows(top, top + 200)
+    assert source.stopped and "1,000-row budget" in source.stopped
+    assert budget.rows_read <= 1200
+    assert source.rows(90000, 90020) == []
@@ -0,0 +1,74 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import nl2sql
+from server import QueryService, RequestError, _dispatch, _read_request
+
+
+@pytest.fixture
+def service(tmp_path):
+    path = str(tmp_path / "t.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(10)])
+    conn.commit()
+    conn.close()
+    service = QueryService(path)
+    yield service
+    service.close()
+
+
+@pytest.mark.parametrize("request_body", [
+    {"sql": "SELECT * FROM t", "page": "two"},
+    {"sql": "SELECT * FROM t", "page_size": None},
+    {"sql": "SELECT * FROM t", "page": -1},
+    {"sql": "SELECT * FROM t", "page_size": -5},
+    {"sql": "SELECT * FROM t", "timeout": "soon"},
+])
+def test_bad_paging_is_a_400(service, request_body):
+    with pytest.raises(RequestError) as e:
+        asyncio.run(service.query(request_body))
+    assert e.value.status == 400
+
+
+def test_numeric_strings_are_accepted(service):
+    result = asyncio.run(service.query({"sql": "SELECT * FROM t", "page": "1", "page_size": "4"}))
+    assert result["rows"] == [[4], [5], [6], [7]]
+
+
+def test_bad_content_length_is_a_400(service):
+    async def send():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"POST /query HTTP/1.1\r\nContent-Length: ten\r\n\r\n")
+        reader.feed_eof()
+        return await _read_request(reader)
+
+    with pytest.raises(RequestError) as e:
+        asyncio.run(send())
+    assert e.value.status == 400
+
+
+def test_translate_is_bounded_by_the_timeout(service):
+    service.timeout = 0.05
+    service.translate = lambda question, table=None: time.sleep(0.5)
+    with pytest.raises(RequestError) as e:
+        asyncio.run(_dispatch(service, "POST", "/translate", b'{"question": "show all"}'))
+    assert e.value.status == 504
+
+
+def test_translate_does_not_wait_for_the_value_index(service, monkeypatch):
+    building = threading.Event()
+
+    def slow_build(index, db_path, table, cancel=None):
+        building.set()
+        cancel.wait(5)
+
+    monkeypatch.setattr(nl2sql, "build_value_index_sqlite", slow_build)
+    start = time.perf_counter()
+    assert service.translate("show all") == "SELECT * FROM t;"
+    assert time.perf_counter() - start < 1
+    assert building.wait(1)
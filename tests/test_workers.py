@@ -0,0 +1,36 @@
+import threading
+
+from workers import BackgroundRunner
+
+
+class FakeApp:
+    # Runs after() callbacks when drained, standing in for the Tk loop
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, fn, *args):
+        self.pending.append((fn, args))
+
+    def drain(self, runner):
+        while runner.busy() or self.pending:
+            if self.pending:
+                fn, args = self.pending.pop(0)
+                fn(*args)
+
+
+def test_cancelled_result_is_discarded():
+    app, release = FakeApp(), threading.Event()
+    runner = BackgroundRunner(app)
+    seen = {"done": [], "discarded": [], "cancelled": 0}
+
+    def cancelled():
+        seen["cancelled"] += 1
+
+    task = runner.submit("query", lambda cancel: release.wait() and "open stream",
+                         on_done=seen["done"].append, on_cancel=cancelled,
+                         on_discard=seen["discarded"].append)
+    task.cancel()
+    release.set()
+    app.drain(runner)
+    runner.shutdown()
+    assert seen == {"done": [], "discarded": ["open stream"], "cancelled": 1}
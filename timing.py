@@ -0,0 +1,129 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+from contextlib import contextmanager
+
+TRACE_DIR = os.path.join(os.path.expanduser("~"), ".askdb")
+TRACE_PATH = os.path.join(TRACE_DIR, "trace.jsonl")
+PROFILE_DIR = os.path.join(TRACE_DIR, "profiles")
+MAX_TRACE_BYTES = 5 * 1024 * 1024
+TRACE_BACKUPS = 3
+PROFILE_LINES = 25
+
+# Pipeline order; also the order stages are listed in the status bar
+STAGES = ("listen", "speech_to_text", "nl2sql", "sql", "count", "frame_sql", "render", "tts")
+LABELS = {"listen": "listen", "speech_to_text": "STT", "nl2sql": "NL→SQL", "sql": "SQL",
+          "count": "count", "frame_sql": "pandas", "render": "render", "tts": "TTS"}
+
+
+# ----------------- Query Trace -------------------
+# Collects the stage timings of one question as it moves from the microphone
+# to the grid. Stages run on worker threads and the UI thread one after the
+# other, so no locking is needed.
+class QueryTrace:
+    def __init__(self, query=""):
+        self.started = time.time()
+        self.query = query
+        self.sql = None
+        self.source = None
+        self.rows = None
+        self.error = None
+        self.warning = None
+        self.profile = None
+        # Per-column dtype/bytes before and after compacting, for file loads
+        self.memory = None
+        self.stages = {}
+        self.written = False
+
+    def add(self, name, ms):
+        self.stages[name] = self.stages.get(name, 0.0) + ms
+
+    def has(self, name):
+        return name in self.stages
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def summary(self):
+        parts = [f"{LABELS.get(name, name)} {_ms(self.stages[name])} ms"
+                 for name in sorted(self.stages, key=_stage_order)]
+        if self.rows is not None:
+            parts.append(f"{self.rows:,} rows")
+        if self.source == "cache":
+            parts.append("cached")
+        if self.warning:
+            parts.append(self.warning)
+        if self.error:
+            parts.append(f"error: {self.error}")
+        return " · ".join(parts) or "Ready"
+
+    def record(self):
+        return {
+            "time": round(self.started, 3),
+            "query": self.query,
+            "sql": self.sql,
+            "source": self.source,
+            "rows": self.rows,
+            "stages": {k: round(v, 2) for k, v in self.stages.items()},
+            "total_ms": round(sum(self.stages.values()), 2),
+            "error": self.error,
+            "warning": self.warning,
+            "profile": self.profile,
+            "memory": self.memory,
+        }
+
+
+def _ms(value):
+    return f"{value:.1f}" if value < 10 else f"{value:,.0f}"
+
+
+def _stage_order(name):
+    return STAGES.index(name) if name in STAGES else len(STAGES)
+
+
+# ----------------- Trace File -------------------
+def _rotate(path, backups):
+    for i in range(backups - 1, 0, -1):
+        src = f"{path}.{i}"
+        if os.path.exists(src):
+            os.replace(src, f"{path}.{i + 1}")
+    os.replace(path, f"{path}.1")
+
+
+def write_trace(trace, path=TRACE_PATH, max_bytes=MAX_TRACE_BYTES, backups=TRACE_BACKUPS):
+    # Appends one JSON line; the file is rotated to path.1..path.N when full
+    if trace.written:
+        return
+    trace.written = True
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+            _rotate(path, backups)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(trace.record(), default=str) + "\n")
+    except OSError:
+        pass
+
+
+# ----------------- Profiling -------------------
+def profiled(fn, *args, profile_dir=PROFILE_DIR):
+    # Runs fn under cProfile on the calling thread. Returns (result, path of
+    # the .prof dump, text of the top functions by cumulative time).
+    profiler = cProfile.Profile()
+    try:
+        result = profiler.runcall(fn, *args)
+    finally:
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, time.strftime("query-%Y%m%d-%H%M%S.prof"))
+        profiler.dump_stats(path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_LINES)
+    return result, path, out.getvalue()
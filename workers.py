@@ -0,0 +1,80 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_MS = 50
+
+
+class Task:
+    def __init__(self, name):
+        self.name = name
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+
+# ----------------- Background Runner -------------------
+# Runs work on a thread pool and hands results back to Tk on the main loop:
+# workers only put results on a queue, which is drained with app.after().
+class BackgroundRunner:
+    def __init__(self, app, max_workers=2):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="askdb")
+        self._results = queue.Queue()
+        self._pending = 0
+        self._polling = False
+
+    def submit(self, name, fn, on_done=None, on_error=None, on_cancel=None, on_discard=None):
+        # fn receives the task's cancel Event and runs on a worker thread;
+        # the callbacks always run on the Tk thread. on_discard gets the
+        # result of a task that finished but was cancelled meanwhile, so
+        # anything it holds open can be released.
+        task = Task(name)
+
+        def work():
+            try:
+                result = fn(task.cancel_event)
+            except Exception as e:
+                self._results.put((task, on_error, (on_cancel, None), e, False))
+            else:
+                self._results.put((task, on_done, (on_cancel, on_discard), result, True))
+
+        self._pending += 1
+        task.future = self.executor.submit(work)
+        if not self._polling:
+            self._polling = True
+            self.app.after(POLL_MS, self._poll)
+        return task
+
+    def _poll(self):
+        while True:
+            try:
+                task, callback, (on_cancel, on_discard), value, ok = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if task.cancelled:
+                if on_discard:
+                    on_discard(value)
+                if on_cancel:
+                    on_cancel()
+            elif callback:
+                callback(value)
+            elif not ok:
+                raise value
+        if self._pending:
+            self.app.after(POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def busy(self):
+        return self._pending > 0
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)